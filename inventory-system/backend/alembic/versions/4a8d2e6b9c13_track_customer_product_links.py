@@ -0,0 +1,42 @@
+"""Track customer product links for delta sync
+
+Revision ID: 4a8d2e6b9c13
+Revises: f19e7a2c4b60
+Create Date: 2026-10-18 19:12:40.518362
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4a8d2e6b9c13'
+down_revision: Union[str, Sequence[str], None] = 'f19e7a2c4b60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def has_link_table():
+    # 9e1758bf6a54 never created the table; databases get it from create_all
+    return sa.inspect(op.get_bind()).has_table('customerproductlink')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing links start at 0, so they are part of every client's first full sync.
+    if not has_link_table():
+        return
+    with op.batch_alter_table('customerproductlink', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('change_seq', sa.Integer(), nullable=False, server_default='0'))
+        batch_op.create_index(batch_op.f('ix_customerproductlink_change_seq'), ['change_seq'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if not has_link_table():
+        return
+    with op.batch_alter_table('customerproductlink', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_customerproductlink_change_seq'))
+        batch_op.drop_column('change_seq')
@@ -0,0 +1,69 @@
+"""Add stock reservations
+
+Revision ID: b7c41e9d2f08
+Revises: 9e1758bf6a54
+Create Date: 2026-10-18 09:12:41.503217
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7c41e9d2f08'
+down_revision: Union[str, Sequence[str], None] = '9e1758bf6a54'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('inventory', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('reserved_quantity', sa.Integer(), nullable=False, server_default='0'))
+
+    op.create_table('reservation',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('customer_id', sa.Integer(), nullable=False),
+    sa.Column('status', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['customer_id'], ['customer.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('reservation', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_reservation_status'), ['status'], unique=False)
+        batch_op.create_index(batch_op.f('ix_reservation_expires_at'), ['expires_at'], unique=False)
+
+    op.create_table('reservationitem',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('reservation_id', sa.Integer(), nullable=False),
+    sa.Column('inventory_id', sa.Integer(), nullable=False),
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('stock_source_customer_id', sa.Integer(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['reservation_id'], ['reservation.id'], ),
+    sa.ForeignKeyConstraint(['inventory_id'], ['inventory.id'], ),
+    sa.ForeignKeyConstraint(['product_id'], ['product.id'], ),
+    sa.ForeignKeyConstraint(['stock_source_customer_id'], ['customer.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('reservationitem', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_reservationitem_reservation_id'), ['reservation_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('reservationitem', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_reservationitem_reservation_id'))
+    op.drop_table('reservationitem')
+
+    with op.batch_alter_table('reservation', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_reservation_expires_at'))
+        batch_op.drop_index(batch_op.f('ix_reservation_status'))
+    op.drop_table('reservation')
+
+    with op.batch_alter_table('inventory', schema=None) as batch_op:
+        batch_op.drop_column('reserved_quantity')
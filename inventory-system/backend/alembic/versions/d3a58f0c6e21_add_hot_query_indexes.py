@@ -0,0 +1,66 @@
+"""Add hot query indexes
+
+Revision ID: d3a58f0c6e21
+Revises: b7c41e9d2f08
+Create Date: 2026-10-18 14:37:05.812466
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3a58f0c6e21'
+down_revision: Union[str, Sequence[str], None] = 'b7c41e9d2f08'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Fold duplicate customer/product inventory rows into the lowest id so the
+    # unique index can be created.
+    op.execute("""
+        UPDATE inventory SET
+            quantity = (SELECT SUM(d.quantity) FROM inventory d
+                        WHERE d.customer_id = inventory.customer_id AND d.product_id = inventory.product_id),
+            reserved_quantity = (SELECT SUM(d.reserved_quantity) FROM inventory d
+                                 WHERE d.customer_id = inventory.customer_id AND d.product_id = inventory.product_id)
+        WHERE id IN (SELECT MIN(id) FROM inventory GROUP BY customer_id, product_id HAVING COUNT(*) > 1)
+    """)
+    op.execute("""
+        UPDATE reservationitem SET inventory_id = (
+            SELECT MIN(k.id) FROM inventory k JOIN inventory d
+                ON k.customer_id = d.customer_id AND k.product_id = d.product_id
+            WHERE d.id = reservationitem.inventory_id
+        )
+    """)
+    op.execute("""
+        DELETE FROM inventory
+        WHERE id NOT IN (SELECT MIN(id) FROM inventory GROUP BY customer_id, product_id)
+    """)
+
+    with op.batch_alter_table('inventory', schema=None) as batch_op:
+        batch_op.create_index('ix_inventory_customer_id_product_id', ['customer_id', 'product_id'], unique=True)
+
+    with op.batch_alter_table('shipment', schema=None) as batch_op:
+        batch_op.create_index('ix_shipment_customer_id_product_id', ['customer_id', 'product_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_shipment_created_at'), ['created_at'], unique=False)
+
+    with op.batch_alter_table('inboundtransaction', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_inboundtransaction_inbound_date'), ['inbound_date'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('inboundtransaction', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_inboundtransaction_inbound_date'))
+
+    with op.batch_alter_table('shipment', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_shipment_created_at'))
+        batch_op.drop_index('ix_shipment_customer_id_product_id')
+
+    with op.batch_alter_table('inventory', schema=None) as batch_op:
+        batch_op.drop_index('ix_inventory_customer_id_product_id')
@@ -0,0 +1,66 @@
+"""Add change tracking for delta sync
+
+Revision ID: f19e7a2c4b60
+Revises: d3a58f0c6e21
+Create Date: 2026-10-18 16:02:51.274930
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f19e7a2c4b60'
+down_revision: Union[str, Sequence[str], None] = 'd3a58f0c6e21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TRACKED_TABLES = ['customer', 'product', 'inventory', 'shipment', 'inboundtransaction']
+
+
+def existing_tables():
+    inspector = sa.inspect(op.get_bind())
+    return [table for table in TRACKED_TABLES if inspector.has_table(table)]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing rows start at 0, so they are part of every client's first full sync.
+    # Shard files have no customer/product tables, so only touch what exists.
+    for table in existing_tables():
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.add_column(sa.Column('change_seq', sa.Integer(), nullable=False, server_default='0'))
+            batch_op.create_index(batch_op.f(f'ix_{table}_change_seq'), ['change_seq'], unique=False)
+
+    op.create_table('changesequence',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('value', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('tombstone',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('table_name', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('row_id', sa.Integer(), nullable=False),
+    sa.Column('customer_id', sa.Integer(), nullable=True),
+    sa.Column('change_seq', sa.Integer(), nullable=False),
+    sa.Column('deleted_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('tombstone', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_tombstone_change_seq'), ['change_seq'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('tombstone', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_tombstone_change_seq'))
+    op.drop_table('tombstone')
+    op.drop_table('changesequence')
+
+    for table in reversed(existing_tables()):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_index(batch_op.f(f'ix_{table}_change_seq'))
+            batch_op.drop_column('change_seq')
@@ -1,8 +1,15 @@
 from typing import List, Optional
-from datetime import datetime
+from datetime import datetime, timedelta
 from contextlib import asynccontextmanager
+import asyncio
+import glob
+import os
+import threading
+from collections import OrderedDict
 from sqlmodel import Field, Session, SQLModel, create_engine, select, Relationship
+from sqlalchemy import func, case, and_, event, insert, update, delete, Index, inspect as sa_inspect
 from sqlalchemy.orm import selectinload
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
@@ -14,6 +21,7 @@ class Customer(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     name: str = Field(index=True)
     contact_info: Optional[str] = None
+    change_seq: int = Field(default=0, index=True) # Stamped on every write for delta sync
     
 class Product(SQLModel, table=True):
     __table_args__ = {"extend_existing": True}
@@ -21,29 +29,40 @@ class Product(SQLModel, table=True):
     sku_code: str = Field(unique=True, index=True)
     name: str
     description: Optional[str] = None
+    change_seq: int = Field(default=0, index=True)
 
 class Inventory(SQLModel, table=True):
-    __table_args__ = {"extend_existing": True}
+    __table_args__ = (
+        # One row per customer/product pair; also serves every stock lookup
+        Index("ix_inventory_customer_id_product_id", "customer_id", "product_id", unique=True),
+        {"extend_existing": True},
+    )
     id: Optional[int] = Field(default=None, primary_key=True)
     customer_id: int = Field(foreign_key="customer.id")
     product_id: int = Field(foreign_key="product.id")
     quantity: int
     target_stock: int = Field(default=0)
     safety_stock: int = Field(default=0)
+    reserved_quantity: int = Field(default=0) # Sum of active reservations (available = quantity - reserved_quantity)
     updated_at: datetime = Field(default_factory=datetime.now)
+    change_seq: int = Field(default=0, index=True)
 
     customer: Optional[Customer] = Relationship()
     product: Optional[Product] = Relationship()
 
 class Shipment(SQLModel, table=True):
-    __table_args__ = {"extend_existing": True}
+    __table_args__ = (
+        Index("ix_shipment_customer_id_product_id", "customer_id", "product_id"),
+        {"extend_existing": True},
+    )
     id: Optional[int] = Field(default=None, primary_key=True)
     customer_id: int = Field(foreign_key="customer.id")
     product_id: int = Field(foreign_key="product.id")
     quantity: int
     shipment_date: datetime
     rma_ticket: Optional[str] = None
-    created_at: datetime = Field(default_factory=datetime.now)
+    created_at: datetime = Field(default_factory=datetime.now, index=True)
+    change_seq: int = Field(default=0, index=True)
     
     customer: Optional[Customer] = Relationship()
     product: Optional[Product] = Relationship()
@@ -54,8 +73,9 @@ class InboundTransaction(SQLModel, table=True):
     customer_id: int = Field(foreign_key="customer.id")
     product_id: int = Field(foreign_key="product.id")
     quantity: int
-    inbound_date: datetime = Field(default_factory=datetime.now)
+    inbound_date: datetime = Field(default_factory=datetime.now, index=True)
     remarks: Optional[str] = None
+    change_seq: int = Field(default=0, index=True)
     
     customer: Optional[Customer] = Relationship()
     product: Optional[Product] = Relationship()
@@ -64,6 +84,40 @@ class CustomerProductLink(SQLModel, table=True):
     __table_args__ = {"extend_existing": True}
     customer_id: int = Field(foreign_key="customer.id", primary_key=True)
     product_id: int = Field(foreign_key="product.id", primary_key=True)
+    change_seq: int = Field(default=0, index=True)
+
+class ReservationItem(SQLModel, table=True):
+    __table_args__ = {"extend_existing": True}
+    id: Optional[int] = Field(default=None, primary_key=True)
+    reservation_id: int = Field(foreign_key="reservation.id", index=True)
+    inventory_id: int = Field(foreign_key="inventory.id")
+    product_id: int = Field(foreign_key="product.id")
+    stock_source_customer_id: int = Field(foreign_key="customer.id")
+    quantity: int
+
+class Reservation(SQLModel, table=True):
+    __table_args__ = {"extend_existing": True}
+    id: Optional[int] = Field(default=None, primary_key=True)
+    customer_id: int = Field(foreign_key="customer.id")
+    status: str = Field(default="active", index=True) # active / committed / released / expired
+    expires_at: datetime = Field(index=True)
+    created_at: datetime = Field(default_factory=datetime.now)
+
+    items: List[ReservationItem] = Relationship()
+
+class ChangeSequence(SQLModel, table=True):
+    __table_args__ = {"extend_existing": True}
+    id: Optional[int] = Field(default=None, primary_key=True)
+    value: int = Field(default=0)
+
+class Tombstone(SQLModel, table=True):
+    __table_args__ = {"extend_existing": True}
+    id: Optional[int] = Field(default=None, primary_key=True)
+    table_name: str
+    row_id: int # product_id for customerproductlink rows, which are keyed by (customer_id, product_id)
+    customer_id: Optional[int] = None
+    change_seq: int = Field(index=True)
+    deleted_at: datetime = Field(default_factory=datetime.now)
 
 # --- Read Models (DTOs) for Responses ---
 class CustomerReadWithProducts(SQLModel):
@@ -79,10 +133,19 @@ class InventoryRead(SQLModel):
     quantity: int
     target_stock: int
     safety_stock: int
+    reserved_quantity: int
     updated_at: datetime
     customer: Customer
     product: Product
 
+class InventorySummaryRead(SQLModel):
+    customer_id: int
+    customer_name: str
+    sku_count: int
+    total_quantity: int
+    below_safety_count: int
+    below_target_count: int
+
 class InventoryCreate(SQLModel):
     customer_id: int
     product_id: int
@@ -122,7 +185,7 @@ class ShipmentUpdate(SQLModel):
 
 class ShipmentItem(SQLModel):
     product_id: int
-    quantity: int
+    quantity: int = Field(gt=0)
     stock_source_customer_id: Optional[int] = None # Source per item
 
 class BatchShipmentCreate(SQLModel):
@@ -131,6 +194,55 @@ class BatchShipmentCreate(SQLModel):
     rma_ticket: Optional[str] = None
     items: List[ShipmentItem]
 
+class ReservationCreate(SQLModel):
+    customer_id: int
+    items: List[ShipmentItem] = Field(min_length=1)
+    ttl_seconds: Optional[int] = Field(default=None, gt=0)
+
+class ReservationExtend(SQLModel):
+    ttl_seconds: Optional[int] = Field(default=None, gt=0)
+
+class ReservationCommit(SQLModel):
+    shipment_date: datetime
+    rma_ticket: Optional[str] = None
+
+class ReservationRead(SQLModel):
+    id: int
+    customer_id: int
+    status: str
+    expires_at: datetime
+    created_at: datetime
+    items: List[ReservationItem] = []
+
+class CatalogProduct(SQLModel):
+    sku_code: str
+    name: str
+    description: Optional[str] = None
+
+class CatalogSync(SQLModel):
+    products: List[CatalogProduct] = []
+    customer_id: Optional[int] = None
+    authorized_skus: Optional[List[str]] = None
+    removed_skus: List[str] = []
+    full: bool = False # authorized_skus is the customer's complete set; unlink anything else
+
+class CatalogSyncResult(SQLModel):
+    products_created: int = 0
+    products_updated: int = 0
+    products_unchanged: int = 0
+    links_created: int = 0
+    links_removed: int = 0
+
+class SyncRead(SQLModel):
+    cursor: str
+    customers: List[Customer] = []
+    products: List[Product] = []
+    inventory: List[Inventory] = []
+    shipments: List[Shipment] = []
+    inbound: List[InboundTransaction] = []
+    links: List[CustomerProductLink] = []
+    tombstones: List[Tombstone] = []
+
 class InboundRead(SQLModel):
     id: int
     customer: Customer
@@ -145,6 +257,267 @@ sqlite_url = f"sqlite:///{sqlite_file_name}"
 connect_args = {"check_same_thread": False}
 engine = create_engine(sqlite_url, connect_args=connect_args)
 
+# --- Optional Sharding ---
+# With WMS_SHARDING=1, per-customer data lives in one SQLite file per customer
+# group (customer_id // WMS_SHARD_GROUP_SIZE) under WMS_SHARD_DIR. The catalog
+# (Customer, Product) stays in database.db, which is ATTACHed to every shard
+# connection so joins and relationship loads against it keep working.
+SHARDING_ENABLED = os.environ.get("WMS_SHARDING", "0") == "1"
+SHARD_GROUP_SIZE = max(1, int(os.environ.get("WMS_SHARD_GROUP_SIZE", "1")))
+SHARD_DIR = os.environ.get("WMS_SHARD_DIR", "shards")
+SHARDED_TABLES = [
+    Inventory.__table__,
+    Shipment.__table__,
+    InboundTransaction.__table__,
+    CustomerProductLink.__table__,
+    Reservation.__table__,
+    ReservationItem.__table__,
+    ChangeSequence.__table__,
+    Tombstone.__table__,
+]
+
+MAX_OPEN_SHARDS = max(1, int(os.environ.get("WMS_MAX_OPEN_SHARDS", "32")))
+
+# Least recently used shard engines; the oldest is disposed past MAX_OPEN_SHARDS
+shard_engines = OrderedDict()
+shard_engines_lock = threading.Lock()
+
+# Shard files already brought to head by this process, and one lock per file
+# so migrating one shard never blocks requests for another
+migrated_shard_paths = set()
+shard_migration_locks = {}
+
+def shard_path(shard_key: int) -> str:
+    return os.path.join(SHARD_DIR, f"customer_{shard_key}.db")
+
+def existing_shard_keys() -> list:
+    paths = glob.glob(os.path.join(SHARD_DIR, "customer_*.db"))
+    return sorted(int(os.path.basename(path)[len("customer_"):-len(".db")]) for path in paths)
+
+def legacy_shard_revision(connection) -> str:
+    # Shards created before they were tracked by Alembic; infer their revision
+    tables = set(sa_inspect(connection).get_table_names())
+    indexes = {ix["name"] for ix in sa_inspect(connection).get_indexes("inventory")}
+    if "tombstone" in tables:
+        return "f19e7a2c4b60"
+    if "ix_inventory_customer_id_product_id" in indexes:
+        return "d3a58f0c6e21"
+    return "b7c41e9d2f08"
+
+def migrate_shard(path: str):
+    # New shards get the current schema and are stamped at head; existing ones
+    # run the normal Alembic chain, so shard files never fall behind the models.
+    from alembic import command
+    from alembic.config import Config
+
+    alembic_cfg = Config(os.path.join(os.path.dirname(os.path.abspath(__file__)), "alembic.ini"))
+    alembic_cfg.set_main_option("sqlalchemy.url", f"sqlite:///{path}")
+    alembic_cfg.attributes["configure_logger"] = False
+
+    is_new = not os.path.exists(path)
+    migration_engine = create_engine(f"sqlite:///{path}")
+    try:
+        if is_new:
+            SQLModel.metadata.create_all(migration_engine, tables=SHARDED_TABLES)
+            command.stamp(alembic_cfg, "head")
+            return
+        with migration_engine.connect() as connection:
+            stamped = sa_inspect(connection).has_table("alembic_version")
+            revision = None if stamped else legacy_shard_revision(connection)
+        if revision:
+            command.stamp(alembic_cfg, revision)
+        command.upgrade(alembic_cfg, "head")
+    finally:
+        migration_engine.dispose()
+
+def ensure_shard_migrated(path: str):
+    path = os.path.abspath(path)
+    if path in migrated_shard_paths:
+        return
+    with shard_engines_lock:
+        migration_lock = shard_migration_locks.setdefault(path, threading.Lock())
+    with migration_lock:
+        if path not in migrated_shard_paths:
+            migrate_shard(path)
+            migrated_shard_paths.add(path)
+
+def open_shard_engine(shard_key: int):
+    os.makedirs(SHARD_DIR, exist_ok=True)
+    path = shard_path(shard_key)
+    ensure_shard_migrated(path)
+
+    shard_engine = create_engine(f"sqlite:///{path}", connect_args=connect_args)
+    catalog_path = os.path.abspath(sqlite_file_name)
+
+    @event.listens_for(shard_engine, "connect")
+    def attach_catalog(dbapi_connection, connection_record):
+        dbapi_connection.execute("ATTACH DATABASE ? AS catalog", (catalog_path,))
+
+    return shard_engine
+
+def get_engine(customer_id: Optional[int] = None, create: bool = True):
+    # Reads pass create=False and get None for a customer without a shard file
+    if not SHARDING_ENABLED or customer_id is None:
+        return engine
+    shard_key = customer_id // SHARD_GROUP_SIZE
+    with shard_engines_lock:
+        if shard_key in shard_engines:
+            shard_engines.move_to_end(shard_key)
+            return shard_engines[shard_key]
+    if not create and not os.path.exists(shard_path(shard_key)):
+        return None
+
+    # Opening (and migrating) happens outside the cache lock
+    shard_engine = open_shard_engine(shard_key)
+    with shard_engines_lock:
+        if shard_key in shard_engines:
+            # Another request opened it meanwhile; keep theirs
+            shard_engine.dispose()
+            shard_engines.move_to_end(shard_key)
+            return shard_engines[shard_key]
+        shard_engines[shard_key] = shard_engine
+        if len(shard_engines) > MAX_OPEN_SHARDS:
+            _, evicted = shard_engines.popitem(last=False)
+            evicted.dispose()
+        return shard_engine
+
+def get_engine_or_404(customer_id: Optional[int], detail: str):
+    data_engine = get_engine(customer_id, create=False)
+    if data_engine is None:
+        raise HTTPException(status_code=404, detail=detail)
+    return data_engine
+
+def scan_shard_engines(shard_keys: list):
+    # Fan-out visits every shard once, so it reuses cached engines without
+    # touching their LRU position and uses a throwaway engine for the rest
+    for shard_key in shard_keys:
+        with shard_engines_lock:
+            cached = shard_engines.get(shard_key)
+        if cached is not None:
+            yield shard_key, cached
+            continue
+        shard_engine = open_shard_engine(shard_key)
+        try:
+            yield shard_key, shard_engine
+        finally:
+            shard_engine.dispose()
+
+def data_engines():
+    # Every engine holding per-customer data, for fan-out reads
+    if not SHARDING_ENABLED:
+        yield engine
+        return
+    for _, shard_engine in scan_shard_engines(existing_shard_keys()):
+        yield shard_engine
+
+def read_all_shards(statement) -> list:
+    results = []
+    for data_engine in data_engines():
+        with Session(data_engine) as session:
+            results.extend(session.exec(statement).all())
+    return results
+
+def find_source_inventory(sessions: "ShardSessions", source_id: int, product_id: int):
+    # A customer without a shard file has no stock, so don't create one here
+    source_session = sessions.get(source_id, create=False)
+    if source_session is None:
+        return None, None
+    inventory_entry = source_session.exec(select(Inventory).where(
+        Inventory.customer_id == source_id,
+        Inventory.product_id == product_id
+    )).first()
+    return source_session, inventory_entry
+
+def require_shard_customer(customer_id: Optional[int]):
+    # Row ids are only unique within a shard, so id-based routes need the owner
+    if SHARDING_ENABLED and customer_id is None:
+        raise HTTPException(status_code=400, detail="customer_id query parameter is required when sharding is enabled.")
+
+class ShardSessions:
+    """Opens one Session per engine touched by a request.
+
+    Without sharding every customer maps to the same session, so a request is a
+    single transaction as before. Cross-shard writes (e.g. shipping from another
+    customer's stock) are not atomic: commit(last=...) commits every other shard
+    first, so stock-source deductions land before the selling customer's rows.
+    """
+
+    def __init__(self):
+        self.sessions = {}
+
+    def for_engine(self, data_engine) -> Session:
+        if data_engine not in self.sessions:
+            self.sessions[data_engine] = Session(data_engine)
+        return self.sessions[data_engine]
+
+    def get(self, customer_id: Optional[int] = None, create: bool = True) -> Optional[Session]:
+        data_engine = get_engine(customer_id, create=create)
+        return self.for_engine(data_engine) if data_engine is not None else None
+
+    def commit(self, last: Optional[Session] = None):
+        for session in self.sessions.values():
+            if session is not last:
+                session.commit()
+        if last is not None:
+            last.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        for session in self.sessions.values():
+            session.close()
+
+# --- Change Tracking ---
+# Each database keeps its own change counter. It is bumped inside the writing
+# transaction, so SQLite's single-writer lock makes sequence order match commit
+# order and a client high-water mark never skips a row.
+CATALOG_MODELS = (Customer, Product)
+CUSTOMER_DATA_MODELS = (Inventory, Shipment, InboundTransaction, CustomerProductLink)
+CHANGE_TRACKED_MODELS = CATALOG_MODELS + CUSTOMER_DATA_MODELS
+
+def tombstone_for(obj, seq: int) -> Tombstone:
+    return Tombstone(
+        table_name=obj.__tablename__,
+        row_id=obj.product_id if isinstance(obj, CustomerProductLink) else obj.id,
+        customer_id=getattr(obj, "customer_id", None),
+        change_seq=seq
+    )
+
+def next_change_seq(session: Session) -> int:
+    connection = session.connection()
+    bumped = connection.execute(
+        update(ChangeSequence).where(ChangeSequence.id == 1).values(value=ChangeSequence.value + 1)
+    )
+    if bumped.rowcount == 0:
+        connection.execute(insert(ChangeSequence).values(id=1, value=1))
+    return connection.execute(select(ChangeSequence.value).where(ChangeSequence.id == 1)).scalar_one()
+
+@event.listens_for(Session, "before_flush")
+def stamp_change_seq(session, flush_context, instances):
+    changed = [obj for obj in session.new if isinstance(obj, CHANGE_TRACKED_MODELS)]
+    changed += [obj for obj in session.dirty if isinstance(obj, CHANGE_TRACKED_MODELS) and session.is_modified(obj)]
+    deleted = [obj for obj in session.deleted if isinstance(obj, CHANGE_TRACKED_MODELS)]
+    if not changed and not deleted:
+        return
+
+    seq = next_change_seq(session)
+    for obj in changed:
+        obj.change_seq = seq
+    for obj in deleted:
+        session.add(tombstone_for(obj, seq))
+
+# Stay well under SQLite's bound-parameter limit for IN (...) lists
+SQLITE_IN_CHUNK_SIZE = 900
+
+def chunked(values: list, size: int = SQLITE_IN_CHUNK_SIZE):
+    for i in range(0, len(values), size):
+        yield values[i:i + size]
+
+# Reservations hold stock for this long unless a TTL is given or they are extended
+DEFAULT_RESERVATION_TTL_SECONDS = 15 * 60
+RESERVATION_SWEEP_INTERVAL_SECONDS = 30
+
 def create_db_and_tables():
     try:
         SQLModel.metadata.create_all(engine)
@@ -154,12 +527,99 @@ def create_db_and_tables():
         else:
             raise e
 
+# Stock and reservation counters are changed with single conditional statements
+# so that concurrent requests cannot both pass an availability check on stale reads.
+def hold_inventory_stock(session: Session, inventory_id: int, quantity: int) -> bool:
+    held = session.execute(update(Inventory).where(
+        Inventory.id == inventory_id,
+        Inventory.quantity - Inventory.reserved_quantity >= quantity
+    ).values(
+        reserved_quantity=Inventory.reserved_quantity + quantity,
+        updated_at=datetime.now(),
+        change_seq=next_change_seq(session)
+    ))
+    return held.rowcount == 1
+
+def deduct_inventory_stock(session: Session, inventory_id: int, quantity: int) -> bool:
+    # Shipments may only take stock that is not held by a reservation
+    deducted = session.execute(update(Inventory).where(
+        Inventory.id == inventory_id,
+        Inventory.quantity - Inventory.reserved_quantity >= quantity
+    ).values(
+        quantity=Inventory.quantity - quantity,
+        updated_at=datetime.now(),
+        change_seq=next_change_seq(session)
+    ))
+    return deducted.rowcount == 1
+
+def restock_inventory(session: Session, inventory_id: int, quantity: int):
+    session.execute(update(Inventory).where(Inventory.id == inventory_id).values(
+        quantity=Inventory.quantity + quantity,
+        updated_at=datetime.now(),
+        change_seq=next_change_seq(session)
+    ))
+
+def release_inventory_stock(session: Session, inventory_id: int, quantity: int):
+    session.execute(update(Inventory).where(Inventory.id == inventory_id).values(
+        reserved_quantity=func.max(Inventory.reserved_quantity - quantity, 0),
+        updated_at=datetime.now(),
+        change_seq=next_change_seq(session)
+    ))
+
+def consume_reserved_stock(session: Session, inventory_id: int, quantity: int):
+    session.execute(update(Inventory).where(Inventory.id == inventory_id).values(
+        quantity=Inventory.quantity - quantity,
+        reserved_quantity=func.max(Inventory.reserved_quantity - quantity, 0),
+        updated_at=datetime.now(),
+        change_seq=next_change_seq(session)
+    ))
+
+def claim_reservation(session: Session, reservation: Reservation, status: str) -> bool:
+    # Only one of commit / release / expiry may move a reservation out of "active"
+    claimed = session.execute(update(Reservation).where(
+        Reservation.id == reservation.id,
+        Reservation.status == "active"
+    ).values(status=status))
+    return claimed.rowcount == 1
+
+def release_reservation_stock(sessions: ShardSessions, reservation: Reservation):
+    # Give the held quantity back to available-to-promise
+    for item in reservation.items:
+        release_inventory_stock(sessions.get(item.stock_source_customer_id), item.inventory_id, item.quantity)
+
+def expire_reservations() -> int:
+    expired_count = 0
+    for data_engine in data_engines():
+        with ShardSessions() as sessions:
+            session = sessions.for_engine(data_engine)
+            statement = select(Reservation).options(selectinload(Reservation.items)).where(
+                Reservation.status == "active",
+                Reservation.expires_at <= datetime.now()
+            )
+            expired = session.exec(statement).all()
+            for reservation in expired:
+                if claim_reservation(session, reservation, "expired"):
+                    release_reservation_stock(sessions, reservation)
+                    expired_count += 1
+            sessions.commit(last=session)
+    return expired_count
+
+async def reservation_sweeper():
+    while True:
+        await asyncio.sleep(RESERVATION_SWEEP_INTERVAL_SECONDS)
+        try:
+            await asyncio.to_thread(expire_reservations)
+        except Exception as e:
+            print(f"Reservation sweep failed: {e}")
+
 # --- FastAPI App & Lifespan ---
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     create_db_and_tables()
+    sweeper = asyncio.create_task(reservation_sweeper())
     yield
+    sweeper.cancel()
 
 app = FastAPI(title="Inventory System API", lifespan=lifespan)
 
@@ -185,19 +645,22 @@ def read_customers():
     results = []
     with Session(engine) as session:
         customers = session.exec(select(Customer)).all()
-        for cust in customers:
-            # Query linked products for each customer
-            statement = select(Product).join(CustomerProductLink).where(CustomerProductLink.customer_id == cust.id)
-            linked_prods = session.exec(statement).all()
-            
-            cust_data = CustomerReadWithProducts(
-                id=cust.id,
-                name=cust.name,
-                contact_info=cust.contact_info,
-                products=linked_prods
-            )
-            results.append(cust_data)
-        return results
+
+    # One links query per shard rather than per customer
+    linked_prods = {}
+    statement = select(CustomerProductLink.customer_id, Product).join(Product, Product.id == CustomerProductLink.product_id)
+    for customer_id, product in read_all_shards(statement):
+        linked_prods.setdefault(customer_id, []).append(product)
+
+    for cust in customers:
+        cust_data = CustomerReadWithProducts(
+            id=cust.id,
+            name=cust.name,
+            contact_info=cust.contact_info,
+            products=linked_prods.get(cust.id, [])
+        )
+        results.append(cust_data)
+    return results
 
 @app.put("/customers/{customer_id}", response_model=Customer)
 def update_customer(customer_id: int, customer_data: Customer):
@@ -270,20 +733,230 @@ def delete_product(product_id: int):
         session.commit()
         return {"ok": True}
 
+# --- Catalog Sync Routes ---
+@app.post("/catalog/sync", response_model=CatalogSyncResult)
+def sync_catalog(sync_data: CatalogSync):
+    result = CatalogSyncResult()
+    # Last definition wins if a SKU appears twice
+    incoming = {p.sku_code: p for p in sync_data.products}
+
+    if sync_data.full and sync_data.authorized_skus is None:
+        # An omitted list is not an empty one; never unlink everything by accident
+        raise HTTPException(status_code=400, detail="A full sync requires authorized_skus.")
+
+    with ShardSessions() as sessions:
+        session = sessions.get()
+        if sync_data.customer_id is not None and not session.get(Customer, sync_data.customer_id):
+            raise HTTPException(status_code=404, detail="Customer not found")
+
+        existing = {
+            row.sku_code: row
+            for row in session.exec(select(Product.id, Product.sku_code, Product.name, Product.description)).all()
+        }
+
+        new_rows = []
+        changed_rows = []
+        for sku, p in incoming.items():
+            current = existing.get(sku)
+            if current is None:
+                new_rows.append({"sku_code": sku, "name": p.name, "description": p.description})
+            elif (current.name, current.description) != (p.name, p.description):
+                changed_rows.append({"id": current.id, "name": p.name, "description": p.description})
+            else:
+                result.products_unchanged += 1
+
+        # Bulk statements skip the flush hook, so stamp the change sequence here
+        if new_rows or changed_rows:
+            seq = next_change_seq(session)
+            for row in new_rows + changed_rows:
+                row["change_seq"] = seq
+        if new_rows:
+            session.execute(insert(Product), new_rows)
+        if changed_rows:
+            session.execute(update(Product), changed_rows)
+        result.products_created = len(new_rows)
+        result.products_updated = len(changed_rows)
+
+        if sync_data.customer_id is not None and (sync_data.authorized_skus is not None or sync_data.removed_skus):
+            sku_to_id = {sku: row.id for sku, row in existing.items()}
+            for skus in chunked([r["sku_code"] for r in new_rows]):
+                for row in session.exec(select(Product.id, Product.sku_code).where(Product.sku_code.in_(skus))).all():
+                    sku_to_id[row.sku_code] = row.id
+
+            requested = set(sync_data.authorized_skus or []) | set(sync_data.removed_skus)
+            unknown = sorted(requested - sku_to_id.keys())
+            if unknown:
+                raise HTTPException(status_code=400, detail=f"Unknown SKU codes: {', '.join(unknown[:20])}")
+
+            link_session = sessions.get(sync_data.customer_id)
+            linked = set(link_session.exec(select(CustomerProductLink.product_id).where(
+                CustomerProductLink.customer_id == sync_data.customer_id
+            )).all())
+            authorized = {sku_to_id[sku] for sku in sync_data.authorized_skus or []}
+
+            to_link = sorted(authorized - linked)
+            if sync_data.full:
+                to_unlink = sorted(linked - authorized)
+            else:
+                to_unlink = sorted({sku_to_id[sku] for sku in sync_data.removed_skus} & linked)
+
+            # Links may live in a shard with its own change counter
+            if to_link or to_unlink:
+                link_seq = next_change_seq(link_session)
+            if to_link:
+                link_session.execute(insert(CustomerProductLink), [
+                    {"customer_id": sync_data.customer_id, "product_id": product_id, "change_seq": link_seq}
+                    for product_id in to_link
+                ])
+            for ids in chunked(to_unlink):
+                link_session.execute(delete(CustomerProductLink).where(
+                    CustomerProductLink.customer_id == sync_data.customer_id,
+                    CustomerProductLink.product_id.in_(ids)
+                ))
+            if to_unlink:
+                deleted_at = datetime.now()
+                link_session.execute(insert(Tombstone), [
+                    {"table_name": CustomerProductLink.__tablename__, "row_id": product_id,
+                     "customer_id": sync_data.customer_id, "change_seq": link_seq, "deleted_at": deleted_at}
+                    for product_id in to_unlink
+                ])
+            result.links_created = len(to_link)
+            result.links_removed = len(to_unlink)
+
+        sessions.commit()
+        return result
+
+# --- Delta Sync Routes ---
+SYNC_FIELDS = {
+    Customer: "customers",
+    Product: "products",
+    Inventory: "inventory",
+    Shipment: "shipments",
+    InboundTransaction: "inbound",
+    CustomerProductLink: "links",
+}
+
+def sync_sources(customer_id: Optional[int] = None):
+    # (cursor key, engine, models whose rows live there)
+    if not SHARDING_ENABLED:
+        yield "main", engine, CHANGE_TRACKED_MODELS
+        return
+    if customer_id is not None:
+        shard_keys = [k for k in existing_shard_keys() if k == customer_id // SHARD_GROUP_SIZE]
+    else:
+        shard_keys = existing_shard_keys()
+    yield "catalog", engine, CATALOG_MODELS
+    for k, shard_engine in scan_shard_engines(shard_keys):
+        yield f"shard{k}", shard_engine, CUSTOMER_DATA_MODELS
+
+def parse_sync_cursor(cursor: Optional[str]) -> dict:
+    marks = {}
+    if not cursor:
+        return marks
+    try:
+        for part in cursor.split(","):
+            key, seq = part.split(":")
+            marks[key] = int(seq)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Malformed sync cursor")
+    return marks
+
+@app.get("/sync/", response_model=SyncRead)
+def read_changes(since: Optional[str] = None, customer_id: Optional[int] = None):
+    # Without a cursor the client gets a full snapshot and no tombstones
+    marks = parse_sync_cursor(since)
+    changes = {field: [] for field in list(SYNC_FIELDS.values()) + ["tombstones"]}
+    new_marks = {}
+
+    for key, source_engine, models in sync_sources(customer_id):
+        with Session(source_engine) as session:
+            # Read the high-water mark first; rows past it belong to the next sync
+            high = session.exec(select(ChangeSequence.value).where(ChangeSequence.id == 1)).first() or 0
+            low = marks.get(key, -1)
+            new_marks[key] = high
+
+            for model in models:
+                statement = select(model).where(model.change_seq > low, model.change_seq <= high).order_by(model.change_seq)
+                if customer_id is not None and model in CUSTOMER_DATA_MODELS:
+                    statement = statement.where(model.customer_id == customer_id)
+                changes[SYNC_FIELDS[model]].extend(session.exec(statement).all())
+
+            if low >= 0:
+                statement = select(Tombstone).where(
+                    Tombstone.change_seq > low,
+                    Tombstone.change_seq <= high,
+                    Tombstone.table_name.in_([m.__tablename__ for m in models])
+                ).order_by(Tombstone.change_seq)
+                if customer_id is not None:
+                    statement = statement.where((Tombstone.customer_id == customer_id) | (Tombstone.customer_id == None))
+                changes["tombstones"].extend(session.exec(statement).all())
+
+    cursor = ",".join(f"{key}:{seq}" for key, seq in new_marks.items())
+    return SyncRead(cursor=cursor, **changes)
+
 # --- Inventory Routes ---
 @app.get("/inventory/", response_model=List[InventoryRead])
-def read_inventory():
-    with Session(engine) as session:
-        statement = select(Inventory).options(
-            selectinload(Inventory.customer), 
-            selectinload(Inventory.product)
-        )
+def read_inventory(customer_id: Optional[int] = None):
+    statement = select(Inventory).options(
+        selectinload(Inventory.customer), 
+        selectinload(Inventory.product)
+    )
+    if customer_id is None:
+        return read_all_shards(statement)
+
+    # Drill-down: only one customer's lines
+    customer_engine = get_engine(customer_id, create=False)
+    if customer_engine is None:
+        return []
+    with Session(customer_engine) as session:
+        statement = statement.where(Inventory.customer_id == customer_id)
         items = session.exec(statement).all()
         return items
 
+@app.get("/inventory/summary", response_model=List[InventorySummaryRead])
+def read_inventory_summary(customer_id: Optional[int] = None, product_id: Optional[int] = None):
+    # Aggregate per customer in SQL so the dashboard does not need every row
+    below_safety = and_(Inventory.safety_stock > 0, Inventory.quantity <= Inventory.safety_stock)
+    below_target = and_(Inventory.target_stock > 0, Inventory.quantity < Inventory.target_stock)
+    statement = select(
+        Inventory.customer_id,
+        Customer.name,
+        func.count(Inventory.id),
+        func.coalesce(func.sum(Inventory.quantity), 0),
+        func.sum(case((below_safety, 1), else_=0)),
+        func.sum(case((below_target, 1), else_=0)),
+    ).join(Customer, Customer.id == Inventory.customer_id)
+
+    if customer_id is not None:
+        statement = statement.where(Inventory.customer_id == customer_id)
+    if product_id is not None:
+        statement = statement.where(Inventory.product_id == product_id)
+
+    statement = statement.group_by(Inventory.customer_id, Customer.name).order_by(Customer.name)
+    if customer_id is not None:
+        customer_engine = get_engine(customer_id, create=False)
+        if customer_engine is None:
+            return []
+        with Session(customer_engine) as session:
+            rows = session.exec(statement).all()
+    else:
+        # Each customer lives in exactly one shard, so per-shard groups never overlap
+        rows = sorted(read_all_shards(statement), key=lambda row: row[1])
+    return [
+        InventorySummaryRead(
+            customer_id=row[0],
+            customer_name=row[1],
+            sku_count=row[2],
+            total_quantity=row[3],
+            below_safety_count=row[4],
+            below_target_count=row[5]
+        )
+        for row in rows
+    ]
+
 @app.post("/inventory/", response_model=InventoryRead)
 def create_inventory_entry(inventory_data: InventoryCreate):
-    with Session(engine) as session:
+    with Session(get_engine(inventory_data.customer_id)) as session:
         inbound = InboundTransaction(
             customer_id=inventory_data.customer_id,
             product_id=inventory_data.product_id,
@@ -292,37 +965,46 @@ def create_inventory_entry(inventory_data: InventoryCreate):
         )
         session.add(inbound)
 
-        existing = session.exec(select(Inventory).where(
+        # One upsert on the (customer_id, product_id) unique index, so two
+        # stock-ins for a new pair cannot both try to insert
+        upsert = sqlite_insert(Inventory).values(
+            customer_id=inventory_data.customer_id,
+            product_id=inventory_data.product_id,
+            quantity=inventory_data.quantity,
+            target_stock=inventory_data.target_stock or 0,
+            safety_stock=inventory_data.safety_stock or 0,
+            updated_at=datetime.now(),
+            change_seq=next_change_seq(session)
+        )
+        changes = {
+            "quantity": Inventory.quantity + upsert.excluded.quantity,
+            "updated_at": upsert.excluded.updated_at,
+            "change_seq": upsert.excluded.change_seq,
+        }
+        if inventory_data.target_stock is not None: changes["target_stock"] = upsert.excluded.target_stock
+        if inventory_data.safety_stock is not None: changes["safety_stock"] = upsert.excluded.safety_stock
+        session.execute(upsert.on_conflict_do_update(index_elements=["customer_id", "product_id"], set_=changes))
+        session.commit()
+
+        db_item = session.exec(select(Inventory).where(
             Inventory.customer_id == inventory_data.customer_id,
             Inventory.product_id == inventory_data.product_id
-        )).first()
-        
-        if existing:
-            existing.quantity += inventory_data.quantity
-            existing.updated_at = datetime.now()
-            if inventory_data.target_stock is not None: existing.target_stock = inventory_data.target_stock
-            if inventory_data.safety_stock is not None: existing.safety_stock = inventory_data.safety_stock
-            session.add(existing)
-            db_item = existing
-        else:
-            db_item = Inventory.from_orm(inventory_data)
-            db_item.updated_at = datetime.now()
-            session.add(db_item)
-        
-        session.commit()
-        session.refresh(db_item)
+        )).one()
         _ = db_item.customer
         _ = db_item.product
         return db_item
 
 @app.put("/inventory/{inventory_id}", response_model=InventoryRead)
-def update_inventory_quantity(inventory_id: int, data: InventoryUpdate):
-    with Session(engine) as session:
+def update_inventory_quantity(inventory_id: int, data: InventoryUpdate, customer_id: Optional[int] = None):
+    require_shard_customer(customer_id)
+    with Session(get_engine_or_404(customer_id, "Inventory entry not found")) as session:
         db_item = session.get(Inventory, inventory_id)
         if not db_item:
             raise HTTPException(status_code=404, detail="Inventory entry not found")
         
         if data.quantity is not None:
+            if data.quantity < db_item.reserved_quantity:
+                raise HTTPException(status_code=400, detail=f"Quantity cannot be below the {db_item.reserved_quantity} units reserved.")
             diff = data.quantity - db_item.quantity
             if diff != 0:
                 adjustment = InboundTransaction(
@@ -346,49 +1028,51 @@ def update_inventory_quantity(inventory_id: int, data: InventoryUpdate):
         return db_item
 
 @app.delete("/inventory/{inventory_id}")
-def delete_inventory_entry(inventory_id: int):
-    with Session(engine) as session:
+def delete_inventory_entry(inventory_id: int, customer_id: Optional[int] = None):
+    require_shard_customer(customer_id)
+    with Session(get_engine_or_404(customer_id, "Entry not found")) as session:
         db_item = session.get(Inventory, inventory_id)
         if not db_item:
             raise HTTPException(status_code=404, detail="Entry not found")
+        if db_item.reserved_quantity > 0:
+            raise HTTPException(status_code=400, detail=f"Inventory entry has {db_item.reserved_quantity} units reserved.")
         session.delete(db_item)
         session.commit()
         return {"ok": True}
 
 @app.get("/inbound-history/", response_model=List[InboundRead])
 def read_inbound_history():
-    with Session(engine) as session:
-        statement = select(InboundTransaction).options(
-            selectinload(InboundTransaction.customer),
-            selectinload(InboundTransaction.product)
-        ).order_by(InboundTransaction.inbound_date.desc())
-        return session.exec(statement).all()
+    statement = select(InboundTransaction).options(
+        selectinload(InboundTransaction.customer),
+        selectinload(InboundTransaction.product)
+    ).order_by(InboundTransaction.inbound_date.desc())
+    if not SHARDING_ENABLED:
+        with Session(engine) as session:
+            return session.exec(statement).all()
+    return sorted(read_all_shards(statement), key=lambda t: t.inbound_date, reverse=True)
 
 # --- Shipment Routes ---
 @app.post("/shipments/", response_model=ShipmentRead)
 def create_shipment(shipment_data: ShipmentCreate):
-    with Session(engine) as session:
+    with ShardSessions() as sessions:
         inventory_owner_id = shipment_data.stock_source_customer_id or shipment_data.customer_id
-        inventory_entry = session.exec(select(Inventory).where(
-            Inventory.customer_id == inventory_owner_id,
-            Inventory.product_id == shipment_data.product_id
-        )).first()
+        source_session, inventory_entry = find_source_inventory(sessions, inventory_owner_id, shipment_data.product_id)
 
         if not inventory_entry:
             raise HTTPException(status_code=400, detail=f"No inventory found for Source Customer ID {inventory_owner_id}.")
         
-        if inventory_entry.quantity < shipment_data.quantity:
-            raise HTTPException(status_code=400, detail=f"Insufficient inventory. Current: {inventory_entry.quantity}")
-
-        inventory_entry.quantity -= shipment_data.quantity
-        inventory_entry.updated_at = datetime.now()
-        session.add(inventory_entry)
+        if not deduct_inventory_stock(source_session, inventory_entry.id, shipment_data.quantity):
+            source_session.refresh(inventory_entry)
+            available = inventory_entry.quantity - inventory_entry.reserved_quantity
+            raise HTTPException(status_code=400, detail=f"Insufficient inventory. Available: {available}")
 
         shipment_dict = shipment_data.dict(exclude={"stock_source_customer_id"})
         shipment = Shipment(**shipment_dict)
+        session = sessions.get(shipment_data.customer_id)
         session.add(shipment)
         
-        session.commit()
+        # Source deduction commits before the shipment row
+        sessions.commit(last=session)
         session.refresh(shipment)
         _ = shipment.customer
         _ = shipment.product
@@ -397,28 +1081,23 @@ def create_shipment(shipment_data: ShipmentCreate):
 @app.post("/shipments/batch/", response_model=List[ShipmentRead])
 def create_batch_shipment(batch_data: BatchShipmentCreate):
     created_shipments = []
-    with Session(engine) as session:
+    with ShardSessions() as sessions:
         # No global inventory_owner_id anymore
         
         for item in batch_data.items:
             # Determine source for THIS item (default to selling customer)
             source_id = item.stock_source_customer_id or batch_data.customer_id
             
-            inventory_entry = session.exec(select(Inventory).where(
-                Inventory.customer_id == source_id,
-                Inventory.product_id == item.product_id
-            )).first()
+            source_session, inventory_entry = find_source_inventory(sessions, source_id, item.product_id)
 
             if not inventory_entry:
                 raise HTTPException(status_code=400, detail=f"No inventory found for Product ID {item.product_id} (Source Customer ID: {source_id}).")
             
-            if inventory_entry.quantity < item.quantity:
-                raise HTTPException(status_code=400, detail=f"Insufficient inventory for Product ID {item.product_id} at Source {source_id}. Current: {inventory_entry.quantity}")
-
             # Deduct Inventory
-            inventory_entry.quantity -= item.quantity
-            inventory_entry.updated_at = datetime.now()
-            session.add(inventory_entry)
+            if not deduct_inventory_stock(source_session, inventory_entry.id, item.quantity):
+                source_session.refresh(inventory_entry)
+                available = inventory_entry.quantity - inventory_entry.reserved_quantity
+                raise HTTPException(status_code=400, detail=f"Insufficient inventory for Product ID {item.product_id} at Source {source_id}. Available: {available}")
 
             # Create Shipment Record
             shipment = Shipment(
@@ -433,10 +1112,12 @@ def create_batch_shipment(batch_data: BatchShipmentCreate):
                 # But user didn't ask for DB schema change, just logic.
                 # For now, this meets the requirement of *sending* mixed stock.
             )
-            session.add(shipment)
+            sessions.get(batch_data.customer_id).add(shipment)
             created_shipments.append(shipment)
         
-        session.commit()
+        # Every source shard's deductions commit before the shipment rows
+        session = sessions.get(batch_data.customer_id)
+        sessions.commit(last=session)
         
         for s in created_shipments:
             session.refresh(s)
@@ -447,16 +1128,19 @@ def create_batch_shipment(batch_data: BatchShipmentCreate):
 
 @app.get("/shipments/", response_model=List[ShipmentRead])
 def read_shipments():
-    with Session(engine) as session:
-        statement = select(Shipment).options(
-            selectinload(Shipment.customer),
-            selectinload(Shipment.product)
-        ).order_by(Shipment.created_at.desc())
-        return session.exec(statement).all()
+    statement = select(Shipment).options(
+        selectinload(Shipment.customer),
+        selectinload(Shipment.product)
+    ).order_by(Shipment.created_at.desc())
+    if not SHARDING_ENABLED:
+        with Session(engine) as session:
+            return session.exec(statement).all()
+    return sorted(read_all_shards(statement), key=lambda s: s.created_at, reverse=True)
 
 @app.put("/shipments/{shipment_id}", response_model=ShipmentRead)
-def update_shipment(shipment_id: int, update_data: ShipmentUpdate):
-    with Session(engine) as session:
+def update_shipment(shipment_id: int, update_data: ShipmentUpdate, customer_id: Optional[int] = None):
+    require_shard_customer(customer_id)
+    with Session(get_engine_or_404(customer_id, "Shipment not found")) as session:
         db_shipment = session.get(Shipment, shipment_id)
         if not db_shipment:
             raise HTTPException(status_code=404, detail="Shipment not found")
@@ -472,12 +1156,11 @@ def update_shipment(shipment_id: int, update_data: ShipmentUpdate):
             if not inventory_entry:
                  raise HTTPException(status_code=400, detail="Related inventory record not found to adjust stock.")
             
-            if diff > 0 and inventory_entry.quantity < diff:
-                raise HTTPException(status_code=400, detail="Insufficient stock to increase shipment quantity.")
-            
-            inventory_entry.quantity -= diff
-            inventory_entry.updated_at = datetime.now()
-            session.add(inventory_entry)
+            if diff > 0:
+                if not deduct_inventory_stock(session, inventory_entry.id, diff):
+                    raise HTTPException(status_code=400, detail="Insufficient stock to increase shipment quantity.")
+            else:
+                restock_inventory(session, inventory_entry.id, -diff)
             
             db_shipment.quantity = update_data.quantity
 
@@ -496,8 +1179,9 @@ def update_shipment(shipment_id: int, update_data: ShipmentUpdate):
         return db_shipment
 
 @app.delete("/shipments/{shipment_id}")
-def delete_shipment(shipment_id: int):
-    with Session(engine) as session:
+def delete_shipment(shipment_id: int, customer_id: Optional[int] = None):
+    require_shard_customer(customer_id)
+    with Session(get_engine_or_404(customer_id, "Shipment not found")) as session:
         shipment = session.get(Shipment, shipment_id)
         if not shipment:
             raise HTTPException(status_code=404, detail="Shipment not found")
@@ -508,18 +1192,148 @@ def delete_shipment(shipment_id: int):
         )).first()
         
         if inventory_entry:
-            inventory_entry.quantity += shipment.quantity
-            inventory_entry.updated_at = datetime.now()
-            session.add(inventory_entry)
+            restock_inventory(session, inventory_entry.id, shipment.quantity)
         
         session.delete(shipment)
         session.commit()
         return {"ok": True}
 
+# --- Reservation Routes ---
+@app.post("/reservations/", response_model=ReservationRead)
+def create_reservation(reservation_data: ReservationCreate):
+    ttl = reservation_data.ttl_seconds or DEFAULT_RESERVATION_TTL_SECONDS
+    held_items = []
+    with ShardSessions() as sessions:
+        for item in reservation_data.items:
+            source_id = item.stock_source_customer_id or reservation_data.customer_id
+            source_session, inventory_entry = find_source_inventory(sessions, source_id, item.product_id)
+
+            if not inventory_entry:
+                raise HTTPException(status_code=400, detail=f"No inventory found for Product ID {item.product_id} (Source Customer ID: {source_id}).")
+
+            # Hold stock against the inventory row
+            if not hold_inventory_stock(source_session, inventory_entry.id, item.quantity):
+                source_session.refresh(inventory_entry)
+                available = inventory_entry.quantity - inventory_entry.reserved_quantity
+                raise HTTPException(status_code=400, detail=f"Insufficient inventory for Product ID {item.product_id} at Source {source_id}. Available: {available}")
+            held_items.append((item, source_id, inventory_entry.id))
+
+        # The reservation lives with the selling customer
+        session = sessions.get(reservation_data.customer_id)
+        reservation = Reservation(
+            customer_id=reservation_data.customer_id,
+            expires_at=datetime.now() + timedelta(seconds=ttl)
+        )
+        session.add(reservation)
+        session.flush()
+
+        for item, source_id, inventory_id in held_items:
+            session.add(ReservationItem(
+                reservation_id=reservation.id,
+                inventory_id=inventory_id,
+                product_id=item.product_id,
+                stock_source_customer_id=source_id,
+                quantity=item.quantity
+            ))
+
+        # Holds on the source shards commit before the reservation itself
+        sessions.commit(last=session)
+        session.refresh(reservation)
+        _ = reservation.items
+        return reservation
+
+@app.get("/reservations/", response_model=List[ReservationRead])
+def read_reservations():
+    statement = select(Reservation).options(
+        selectinload(Reservation.items)
+    ).where(Reservation.status == "active").order_by(Reservation.expires_at)
+    if not SHARDING_ENABLED:
+        with Session(engine) as session:
+            return session.exec(statement).all()
+    return sorted(read_all_shards(statement), key=lambda r: r.expires_at)
+
+def get_active_reservation(sessions: ShardSessions, reservation_id: int, customer_id: Optional[int]) -> Reservation:
+    require_shard_customer(customer_id)
+    session = sessions.get(customer_id, create=False)
+    reservation = session.get(Reservation, reservation_id) if session is not None else None
+    if not reservation:
+        raise HTTPException(status_code=404, detail="Reservation not found")
+    if reservation.status == "active" and reservation.expires_at <= datetime.now():
+        # Expired but not yet swept
+        if claim_reservation(session, reservation, "expired"):
+            release_reservation_stock(sessions, reservation)
+        sessions.commit(last=session)
+        session.refresh(reservation)
+    if reservation.status != "active":
+        raise HTTPException(status_code=400, detail=f"Reservation is {reservation.status}.")
+    return reservation
+
+@app.post("/reservations/{reservation_id}/extend", response_model=ReservationRead)
+def extend_reservation(reservation_id: int, extend_data: ReservationExtend, customer_id: Optional[int] = None):
+    ttl = extend_data.ttl_seconds or DEFAULT_RESERVATION_TTL_SECONDS
+    with ShardSessions() as sessions:
+        reservation = get_active_reservation(sessions, reservation_id, customer_id)
+        session = sessions.get(customer_id)
+        # The sweeper may have expired it since the read above
+        extended = session.execute(update(Reservation).where(
+            Reservation.id == reservation.id,
+            Reservation.status == "active"
+        ).values(expires_at=datetime.now() + timedelta(seconds=ttl)))
+        if extended.rowcount == 0:
+            raise HTTPException(status_code=400, detail="Reservation is no longer active.")
+        session.commit()
+        session.refresh(reservation)
+        _ = reservation.items
+        return reservation
+
+@app.post("/reservations/{reservation_id}/release")
+def release_reservation(reservation_id: int, customer_id: Optional[int] = None):
+    with ShardSessions() as sessions:
+        reservation = get_active_reservation(sessions, reservation_id, customer_id)
+        session = sessions.get(customer_id)
+        if not claim_reservation(session, reservation, "released"):
+            raise HTTPException(status_code=400, detail="Reservation is no longer active.")
+        release_reservation_stock(sessions, reservation)
+        sessions.commit(last=session)
+        return {"ok": True}
+
+@app.post("/reservations/{reservation_id}/commit", response_model=List[ShipmentRead])
+def commit_reservation(reservation_id: int, commit_data: ReservationCommit, customer_id: Optional[int] = None):
+    created_shipments = []
+    with ShardSessions() as sessions:
+        reservation = get_active_reservation(sessions, reservation_id, customer_id)
+        session = sessions.get(customer_id)
+        if not claim_reservation(session, reservation, "committed"):
+            raise HTTPException(status_code=400, detail="Reservation is no longer active.")
+
+        for item in reservation.items:
+            # Stock was already held at reservation time, so no availability check here
+            consume_reserved_stock(sessions.get(item.stock_source_customer_id), item.inventory_id, item.quantity)
+
+            shipment = Shipment(
+                customer_id=reservation.customer_id,
+                product_id=item.product_id,
+                quantity=item.quantity,
+                shipment_date=commit_data.shipment_date,
+                rma_ticket=commit_data.rma_ticket
+            )
+            session.add(shipment)
+            created_shipments.append(shipment)
+
+        # Source deductions commit before the shipment rows and status change
+        sessions.commit(last=session)
+
+        for s in created_shipments:
+            session.refresh(s)
+            _ = s.customer
+            _ = s.product
+
+        return created_shipments
+
 # --- Customer-Product Link Routes ---
 @app.post("/customers/{customer_id}/products/{product_id}")
 def link_product_to_customer(customer_id: int, product_id: int):
-    with Session(engine) as session:
+    with Session(get_engine(customer_id)) as session:
         link = session.get(CustomerProductLink, (customer_id, product_id))
         if link:
             return {"ok": True, "message": "Already linked"}
@@ -531,7 +1345,7 @@ def link_product_to_customer(customer_id: int, product_id: int):
 
 @app.delete("/customers/{customer_id}/products/{product_id}")
 def unlink_product_from_customer(customer_id: int, product_id: int):
-    with Session(engine) as session:
+    with Session(get_engine_or_404(customer_id, "Link not found")) as session:
         link = session.get(CustomerProductLink, (customer_id, product_id))
         if not link:
             raise HTTPException(status_code=404, detail="Link not found")
@@ -541,7 +1355,10 @@ def unlink_product_from_customer(customer_id: int, product_id: int):
 
 @app.get("/customers/{customer_id}/products", response_model=List[Product])
 def read_customer_products(customer_id: int):
-    with Session(engine) as session:
+    customer_engine = get_engine(customer_id, create=False)
+    if customer_engine is None:
+        return []
+    with Session(customer_engine) as session:
         statement = select(Product).join(CustomerProductLink).where(CustomerProductLink.customer_id == customer_id)
         products = session.exec(statement).all()
         return products
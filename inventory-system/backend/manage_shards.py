@@ -0,0 +1,106 @@
+"""Maintenance commands for WMS_SHARDING mode.
+
+    python manage_shards.py upgrade          # run Alembic on every shard file
+    python manage_shards.py split [--purge]  # move rows from database.db into shards
+
+Run from inventory-system/backend with the same WMS_SHARD_* environment the
+server uses. Stop the server before running split.
+"""
+import argparse
+import os
+import sys
+
+from sqlmodel import Session, select
+
+import main
+
+# Per-customer tables and the column that picks their shard
+SPLIT_TABLES = [
+    (main.Inventory, main.Inventory.customer_id),
+    (main.Shipment, main.Shipment.customer_id),
+    (main.InboundTransaction, main.InboundTransaction.customer_id),
+    (main.CustomerProductLink, main.CustomerProductLink.customer_id),
+    (main.Reservation, main.Reservation.customer_id),
+]
+DATA_TABLE_NAMES = [m.__tablename__ for m in main.CUSTOMER_DATA_MODELS]
+
+
+def upgrade_shards():
+    for shard_key in main.existing_shard_keys():
+        print(f"Upgrading {main.shard_path(shard_key)}")
+        main.migrate_shard(main.shard_path(shard_key))
+
+
+def split_rows(central: Session):
+    # {customer_id: {table: [rows]}}
+    moves = {}
+
+    def collect(table, statement):
+        for row in central.execute(statement).mappings():
+            moves.setdefault(row["_owner"], {}).setdefault(table, []).append(
+                {k: v for k, v in row.items() if k != "_owner"}
+            )
+
+    for model, owner in SPLIT_TABLES:
+        collect(model.__table__, select(model.__table__, owner.label("_owner")))
+    # Reservation items live with their reservation, i.e. the selling customer
+    collect(main.ReservationItem.__table__, select(
+        main.ReservationItem.__table__, main.Reservation.customer_id.label("_owner")
+    ).join(main.Reservation, main.Reservation.id == main.ReservationItem.reservation_id))
+    collect(main.Tombstone.__table__, select(
+        main.Tombstone.__table__, main.Tombstone.customer_id.label("_owner")
+    ).where(main.Tombstone.table_name.in_(DATA_TABLE_NAMES), main.Tombstone.customer_id != None))
+    return moves
+
+
+def split(purge: bool):
+    if main.existing_shard_keys():
+        sys.exit(f"{main.SHARD_DIR} already contains shard files; split only runs once into an empty directory.")
+
+    with Session(main.engine) as central:
+        moves = split_rows(central)
+        seq = central.exec(select(main.ChangeSequence.value).where(main.ChangeSequence.id == 1)).first() or 0
+
+        # Row ids were unique in database.db, so they stay unique in each shard
+        shard_sessions = {}
+        for customer_id, tables in moves.items():
+            shard_engine = main.get_engine(customer_id)
+            if shard_engine not in shard_sessions:
+                shard_sessions[shard_engine] = Session(shard_engine)
+            shard_session = shard_sessions[shard_engine]
+            for table, rows in tables.items():
+                shard_session.execute(table.insert(), rows)
+                print(f"customer {customer_id}: {len(rows)} {table.name} rows")
+
+        for shard_session in shard_sessions.values():
+            # Carry the counter over so change_seq stays monotonic per shard
+            shard_session.execute(main.ChangeSequence.__table__.insert(), [{"id": 1, "value": seq}])
+            shard_session.commit()
+            shard_session.close()
+
+        if purge:
+            central.execute(main.Tombstone.__table__.delete().where(
+                main.Tombstone.table_name.in_(DATA_TABLE_NAMES), main.Tombstone.customer_id != None
+            ))
+            for table in [main.ReservationItem.__table__] + [m.__table__ for m, _ in SPLIT_TABLES]:
+                central.execute(table.delete())
+            central.commit()
+            print("Removed moved rows from database.db")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("upgrade", help="Run Alembic migrations on every shard file")
+    split_parser = commands.add_parser("split", help="Move per-customer rows from database.db into shard files")
+    split_parser.add_argument("--purge", action="store_true", help="Delete the moved rows from database.db afterwards")
+    args = parser.parse_args()
+
+    if not main.SHARDING_ENABLED:
+        sys.exit("Set WMS_SHARDING=1 (and any WMS_SHARD_* settings) before running this tool.")
+    os.makedirs(main.SHARD_DIR, exist_ok=True)
+
+    if args.command == "upgrade":
+        upgrade_shards()
+    else:
+        split(args.purge)
@@ -0,0 +1,31 @@
+import os
+import sys
+
+import pytest
+from sqlmodel import Session, SQLModel, create_engine
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main
+
+
+@pytest.fixture()
+def db(tmp_path, monkeypatch):
+    test_engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}", connect_args={"check_same_thread": False})
+    SQLModel.metadata.create_all(test_engine)
+    monkeypatch.setattr(main, "engine", test_engine)
+    monkeypatch.setattr(main, "SHARDING_ENABLED", False)
+
+    with Session(test_engine) as session:
+        customers = [main.Customer(name=f"Customer {i}") for i in range(3)]
+        products = [main.Product(sku_code=f"SKU-{i}", name=f"Product {i}") for i in range(5)]
+        session.add_all(customers + products)
+        session.flush()
+        for c in customers:
+            for p in products:
+                session.add(main.Inventory(customer_id=c.id, product_id=p.id, quantity=100, safety_stock=10, target_stock=50))
+                session.add(main.CustomerProductLink(customer_id=c.id, product_id=p.id))
+                session.add(main.InboundTransaction(customer_id=c.id, product_id=p.id, quantity=100))
+                session.add(main.Shipment(customer_id=c.id, product_id=p.id, quantity=1, shipment_date=main.datetime.now()))
+        session.commit()
+    return test_engine
@@ -0,0 +1,99 @@
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+
+import main
+
+
+def linked_skus(db, customer_id=1):
+    with Session(db) as session:
+        return set(session.exec(
+            select(main.Product.sku_code)
+            .join(main.CustomerProductLink, main.CustomerProductLink.product_id == main.Product.id)
+            .where(main.CustomerProductLink.customer_id == customer_id)
+        ).all())
+
+
+def product_count(db):
+    with Session(db) as session:
+        return len(session.exec(select(main.Product.id)).all())
+
+
+def test_sync_counts_created_updated_unchanged(db):
+    client = TestClient(main.app)
+    response = client.post("/catalog/sync", json={"products": [
+        {"sku_code": "SKU-0", "name": "Product 0"},
+        {"sku_code": "SKU-1", "name": "Renamed"},
+        {"sku_code": "SKU-2", "name": "Product 2", "description": "Now described"},
+        {"sku_code": "NEW-1", "name": "New"},
+    ]})
+    assert response.status_code == 200
+    assert response.json() == {
+        "products_created": 1, "products_updated": 2, "products_unchanged": 1,
+        "links_created": 0, "links_removed": 0,
+    }
+
+    with Session(db) as session:
+        renamed = session.exec(select(main.Product).where(main.Product.sku_code == "SKU-1")).one()
+        assert renamed.name == "Renamed"
+
+
+def test_full_sync_unlinks_missing_skus(db):
+    client = TestClient(main.app)
+    response = client.post("/catalog/sync", json={
+        "products": [{"sku_code": "NEW-1", "name": "New"}],
+        "customer_id": 1, "authorized_skus": ["SKU-0", "NEW-1"], "full": True,
+    })
+    assert response.status_code == 200
+    assert response.json()["links_created"] == 1
+    assert response.json()["links_removed"] == 4
+    assert linked_skus(db) == {"SKU-0", "NEW-1"}
+    assert linked_skus(db, customer_id=2) == {f"SKU-{i}" for i in range(5)}
+
+
+def test_delta_sync_only_unlinks_removed_skus(db):
+    client = TestClient(main.app)
+    response = client.post("/catalog/sync", json={
+        "customer_id": 1, "authorized_skus": ["SKU-0"], "removed_skus": ["SKU-1", "SKU-2"],
+    })
+    assert response.status_code == 200
+    assert response.json()["links_created"] == 0
+    assert response.json()["links_removed"] == 2
+    assert linked_skus(db) == {"SKU-0", "SKU-3", "SKU-4"}
+
+
+def test_unknown_sku_rejects_whole_sync(db):
+    client = TestClient(main.app)
+    response = client.post("/catalog/sync", json={
+        "products": [{"sku_code": "NEW-1", "name": "New"}, {"sku_code": "SKU-0", "name": "Renamed"}],
+        "customer_id": 1, "authorized_skus": ["NEW-1", "MISSING"], "full": True,
+    })
+    assert response.status_code == 400
+    assert "MISSING" in response.json()["detail"]
+
+    # Product upserts from the same request are rolled back
+    assert product_count(db) == 5
+    with Session(db) as session:
+        assert session.exec(select(main.Product.name).where(main.Product.sku_code == "SKU-0")).one() == "Product 0"
+    assert linked_skus(db) == {f"SKU-{i}" for i in range(5)}
+
+
+def test_sync_rejects_unknown_customer(db):
+    client = TestClient(main.app)
+    response = client.post("/catalog/sync", json={
+        "products": [{"sku_code": "NEW-1", "name": "New"}],
+        "customer_id": 99, "authorized_skus": ["NEW-1"],
+    })
+    assert response.status_code == 404
+    assert product_count(db) == 5
+
+
+def test_full_sync_requires_authorized_skus(db):
+    client = TestClient(main.app)
+    response = client.post("/catalog/sync", json={"customer_id": 1, "full": True, "removed_skus": ["SKU-0"]})
+    assert response.status_code == 400
+    assert linked_skus(db) == {f"SKU-{i}" for i in range(5)}
+
+    # An explicitly empty list still unlinks everything
+    response = client.post("/catalog/sync", json={"customer_id": 1, "full": True, "authorized_skus": []})
+    assert response.json()["links_removed"] == 5
+    assert linked_skus(db) == set()
@@ -0,0 +1,113 @@
+from fastapi.testclient import TestClient
+
+import main
+
+SHIP_DATE = "2026-01-01T00:00:00"
+
+
+def cursor_of(client, **params):
+    return client.get("/sync/", params=params).json()["cursor"]
+
+
+def changes_since(client, cursor, **params):
+    response = client.get("/sync/", params={"since": cursor, **params})
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_inventory_writes_show_up_after_cursor(db):
+    client = TestClient(main.app)
+    cursor = cursor_of(client)
+    assert client.put("/inventory/1", json={"quantity": 90}).status_code == 200
+    changes = changes_since(client, cursor)
+    assert [(i["id"], i["quantity"]) for i in changes["inventory"]] == [(1, 90)]
+    assert [(i["quantity"], i["remarks"]) for i in changes["inbound"]] == [(-10, "Manual Adjustment (Set Qty: 100 -> 90)")]
+
+    # Reservation holds, releases and commits change the row with bulk UPDATEs
+    reservations = []
+    for action in ("hold", "release", "hold", "commit"):
+        cursor = changes["cursor"]
+        if action == "hold":
+            response = client.post("/reservations/", json={"customer_id": 1, "items": [{"product_id": 1, "quantity": 10}]})
+            reservations.append(response.json()["id"])
+        elif action == "release":
+            response = client.post(f"/reservations/{reservations[-1]}/release")
+        else:
+            response = client.post(f"/reservations/{reservations[-1]}/commit", json={"shipment_date": SHIP_DATE})
+        assert response.status_code == 200
+        changes = changes_since(client, cursor)
+        assert [i["id"] for i in changes["inventory"]] == [1], action
+
+    assert [(s["customer_id"], s["quantity"]) for s in changes["shipments"]] == [(1, 10)]
+    assert changes_since(client, changes["cursor"])["inventory"] == []
+
+
+def test_deletes_leave_tombstones(db):
+    client = TestClient(main.app)
+    cursor = cursor_of(client)
+    assert client.delete("/shipments/1").status_code == 200
+    assert client.delete("/inventory/2").status_code == 200
+    assert client.delete("/products/5").status_code == 200
+
+    changes = changes_since(client, cursor)
+    assert [(t["table_name"], t["row_id"], t["customer_id"]) for t in changes["tombstones"]] == [
+        ("shipment", 1, 1), ("inventory", 2, 1), ("product", 5, None),
+    ]
+    # Restocking from the deleted shipment is itself a change
+    assert [i["id"] for i in changes["inventory"]] == [1]
+
+
+def test_customer_filter_excludes_other_customers(db):
+    client = TestClient(main.app)
+    cursor = cursor_of(client, customer_id=1)
+    # Shipments 6-10 and inventory 6-10 belong to customer 2
+    assert client.delete("/shipments/6").status_code == 200
+    assert client.put("/inventory/7", json={"quantity": 50}).status_code == 200
+    assert client.delete("/customers/2/products/3").status_code == 200
+    assert client.put("/inventory/2", json={"quantity": 50}).status_code == 200
+
+    mine = changes_since(client, cursor, customer_id=1)
+    assert [i["id"] for i in mine["inventory"]] == [2]
+    assert {i["customer_id"] for i in mine["inbound"]} == {1}
+    assert mine["tombstones"] == [] and mine["links"] == [] and mine["shipments"] == []
+
+    theirs = changes_since(client, cursor, customer_id=2)
+    assert sorted(i["id"] for i in theirs["inventory"]) == [6, 7]
+    assert {(t["table_name"], t["row_id"]) for t in theirs["tombstones"]} == {("shipment", 6), ("customerproductlink", 3)}
+
+
+def test_unlink_leaves_tombstone_and_cursor_advances(db):
+    client = TestClient(main.app)
+    snapshot = client.get("/sync/").json()
+    assert len(snapshot["links"]) == 15
+    assert snapshot["tombstones"] == []
+
+    assert client.delete("/customers/1/products/2").status_code == 200
+    changes = client.get("/sync/", params={"since": snapshot["cursor"]}).json()
+    assert [(t["table_name"], t["customer_id"], t["row_id"]) for t in changes["tombstones"]] == [
+        ("customerproductlink", 1, 2)
+    ]
+
+    again = client.get("/sync/", params={"since": changes["cursor"]}).json()
+    assert again["cursor"] == changes["cursor"]
+    assert all(again[field] == [] for field in list(main.SYNC_FIELDS.values()) + ["tombstones"])
+
+
+def test_catalog_sync_stamps_links_and_tombstones_unlinks(db):
+    client = TestClient(main.app)
+    cursor = client.get("/sync/").json()["cursor"]
+
+    response = client.post("/catalog/sync", json={
+        "products": [{"sku_code": "NEW-1", "name": "New"}],
+        "customer_id": 1, "authorized_skus": ["SKU-0", "NEW-1"], "full": True,
+    })
+    assert response.status_code == 200
+
+    changes = client.get("/sync/", params={"since": cursor, "customer_id": 1}).json()
+    assert [p["sku_code"] for p in changes["products"]] == ["NEW-1"]
+    assert [(l["customer_id"], l["product_id"]) for l in changes["links"]] == [(1, 6)]
+    assert sorted(t["row_id"] for t in changes["tombstones"]) == [2, 3, 4, 5]
+    assert {(t["table_name"], t["customer_id"]) for t in changes["tombstones"]} == {("customerproductlink", 1)}
+
+    again = client.get("/sync/", params={"since": changes["cursor"], "customer_id": 1}).json()
+    assert again["links"] == [] and again["tombstones"] == [] and again["products"] == []
@@ -0,0 +1,40 @@
+import threading
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+
+import main
+
+
+def test_stock_in_adds_to_existing_line(db):
+    client = TestClient(main.app)
+    response = client.post("/inventory/", json={"customer_id": 1, "product_id": 1, "quantity": 25, "safety_stock": 5})
+    assert response.status_code == 200
+    item = response.json()
+    assert (item["id"], item["quantity"], item["safety_stock"], item["target_stock"]) == (1, 125, 5, 0)
+    assert item["product"]["sku_code"] == "SKU-0"
+
+
+def test_concurrent_stock_in_for_new_pair(db):
+    client = TestClient(main.app)
+    product_id = client.post("/products/", json={"sku_code": "NEW-1", "name": "New"}).json()["id"]
+    barrier = threading.Barrier(8)
+    statuses = []
+
+    def stock_in():
+        barrier.wait()
+        response = client.post("/inventory/", json={"customer_id": 1, "product_id": product_id, "quantity": 5})
+        statuses.append(response.status_code)
+
+    threads = [threading.Thread(target=stock_in) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert statuses == [200] * 8
+    with Session(db) as session:
+        lines = session.exec(select(main.Inventory).where(main.Inventory.product_id == product_id)).all()
+        assert [line.quantity for line in lines] == [40]
+        inbound = session.exec(select(main.InboundTransaction).where(main.InboundTransaction.product_id == product_id)).all()
+        assert len(inbound) == 8
@@ -0,0 +1,74 @@
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+import main
+
+
+def set_levels(db, levels):
+    # {inventory_id: (quantity, safety_stock, target_stock)}
+    with Session(db) as session:
+        for inventory_id, (quantity, safety, target) in levels.items():
+            row = session.get(main.Inventory, inventory_id)
+            row.quantity, row.safety_stock, row.target_stock = quantity, safety, target
+            session.add(row)
+        session.commit()
+
+
+def summary(client, **params):
+    response = client.get("/inventory/summary", params=params)
+    assert response.status_code == 200
+    return {row["customer_id"]: row for row in response.json()}
+
+
+def test_summary_totals_and_thresholds(db):
+    # Customer 1 owns inventory rows 1-5 (products 1-5)
+    set_levels(db, {
+        1: (10, 10, 50),  # on the safety line counts (<=); under target
+        2: (50, 10, 50),  # on the target line does not count (<)
+        3: (0, 0, 0),     # zero thresholds are ignored
+        4: (5, 10, 0),    # under safety; no target set
+    })
+    client = TestClient(main.app)
+    rows = summary(client)
+
+    assert [row["customer_name"] for row in rows.values()] == ["Customer 0", "Customer 1", "Customer 2"]
+    assert rows[1] == {
+        "customer_id": 1, "customer_name": "Customer 0", "sku_count": 5, "total_quantity": 165,
+        "below_safety_count": 2, "below_target_count": 1,
+    }
+    for customer_id in (2, 3):
+        assert rows[customer_id]["sku_count"] == 5
+        assert rows[customer_id]["total_quantity"] == 500
+        assert rows[customer_id]["below_safety_count"] == 0
+        assert rows[customer_id]["below_target_count"] == 0
+
+
+def test_summary_filters(db):
+    set_levels(db, {1: (10, 10, 50)})
+    client = TestClient(main.app)
+
+    by_product = summary(client, product_id=1)
+    assert {cid: (row["sku_count"], row["total_quantity"]) for cid, row in by_product.items()} == {
+        1: (1, 10), 2: (1, 100), 3: (1, 100),
+    }
+    assert by_product[1]["below_safety_count"] == 1
+    assert by_product[1]["below_target_count"] == 1
+
+    by_customer = summary(client, customer_id=2)
+    assert list(by_customer) == [2]
+    assert by_customer[2]["total_quantity"] == 500
+
+    assert summary(client, customer_id=1, product_id=1)[1]["sku_count"] == 1
+    assert summary(client, customer_id=99) == {}
+
+
+def test_inventory_drill_down(db):
+    client = TestClient(main.app)
+    response = client.get("/inventory/", params={"customer_id": 2})
+    assert response.status_code == 200
+    items = response.json()
+    assert len(items) == 5
+    assert {item["customer_id"] for item in items} == {2}
+    assert {item["product"]["sku_code"] for item in items} == {f"SKU-{i}" for i in range(5)}
+
+    assert len(client.get("/inventory/").json()) == 15
@@ -0,0 +1,141 @@
+"""EXPLAIN QUERY PLAN checks for the queries each route issues.
+
+Every statement a route sends to SQLite is captured and re-run under
+EXPLAIN QUERY PLAN. A bare "SCAN <table>" (no index) fails the test unless the
+route is expected to read the whole table, e.g. an unfiltered listing.
+"""
+import re
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+import main
+
+FULL_SCAN = re.compile(r"^SCAN (\w+)$")
+
+
+def plans_for(db, call):
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and not statement.lstrip().upper().startswith(("INSERT", "EXPLAIN", "PRAGMA")):
+            captured.append((statement, parameters))
+
+    event.listen(db, "before_cursor_execute", capture)
+    try:
+        response = call(TestClient(main.app))
+    finally:
+        event.remove(db, "before_cursor_execute", capture)
+    assert response.status_code == 200, response.text
+
+    plans = []
+    with db.connect() as conn:
+        for statement, parameters in captured:
+            rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+            plans.append((statement, [row[3] for row in rows]))
+    return plans
+
+
+def assert_no_full_scans(plans, allowed=()):
+    for statement, details in plans:
+        for detail in details:
+            match = FULL_SCAN.match(detail)
+            if match and match.group(1) not in allowed:
+                pytest.fail(f"Full table scan of {match.group(1)}:\n{statement}\n{details}")
+
+
+def test_read_inventory_for_customer(db):
+    plans = plans_for(db, lambda c: c.get("/inventory/", params={"customer_id": 1}))
+    assert_no_full_scans(plans)
+
+
+def test_read_inventory_summary_for_customer(db):
+    plans = plans_for(db, lambda c: c.get("/inventory/summary", params={"customer_id": 1}))
+    assert_no_full_scans(plans)
+
+
+def test_read_inventory_summary_all(db):
+    # Aggregating every customer has to read every inventory row
+    plans = plans_for(db, lambda c: c.get("/inventory/summary"))
+    assert_no_full_scans(plans, allowed={"inventory"})
+
+
+def test_stock_in(db):
+    plans = plans_for(db, lambda c: c.post("/inventory/", json={"customer_id": 1, "product_id": 2, "quantity": 5}))
+    assert_no_full_scans(plans)
+
+
+def test_update_inventory(db):
+    plans = plans_for(db, lambda c: c.put("/inventory/1", json={"quantity": 80, "safety_stock": 5}))
+    assert_no_full_scans(plans)
+
+
+def test_read_inbound_history_uses_date_index(db):
+    plans = plans_for(db, lambda c: c.get("/inbound-history/"))
+    assert_no_full_scans(plans)
+    assert not any("TEMP B-TREE" in d for _, details in plans for d in details)
+
+
+def test_create_shipment(db):
+    plans = plans_for(db, lambda c: c.post("/shipments/", json={
+        "customer_id": 1, "product_id": 1, "quantity": 2,
+        "shipment_date": "2026-01-01T00:00:00", "stock_source_customer_id": 2
+    }))
+    assert_no_full_scans(plans)
+
+
+def test_create_batch_shipment(db):
+    plans = plans_for(db, lambda c: c.post("/shipments/batch/", json={
+        "customer_id": 1, "shipment_date": "2026-01-01T00:00:00",
+        "items": [{"product_id": 1, "quantity": 1}, {"product_id": 2, "quantity": 1, "stock_source_customer_id": 3}]
+    }))
+    assert_no_full_scans(plans)
+
+
+def test_read_shipments_uses_created_at_index(db):
+    plans = plans_for(db, lambda c: c.get("/shipments/"))
+    assert_no_full_scans(plans)
+    assert not any("TEMP B-TREE" in d for _, details in plans for d in details)
+
+
+def test_update_shipment(db):
+    plans = plans_for(db, lambda c: c.put("/shipments/1", json={"quantity": 3}))
+    assert_no_full_scans(plans)
+
+
+def test_delete_shipment(db):
+    plans = plans_for(db, lambda c: c.delete("/shipments/1"))
+    assert_no_full_scans(plans)
+
+
+def test_reservation_lifecycle(db):
+    plans = plans_for(db, lambda c: c.post("/reservations/", json={
+        "customer_id": 1, "items": [{"product_id": 1, "quantity": 5}]
+    }))
+    plans += plans_for(db, lambda c: c.post("/reservations/1/commit", json={"shipment_date": "2026-01-01T00:00:00"}))
+    assert_no_full_scans(plans)
+
+
+def test_read_customer_products(db):
+    plans = plans_for(db, lambda c: c.get("/customers/1/products"))
+    assert_no_full_scans(plans)
+
+
+def test_read_customers(db):
+    # Lists every customer with all of its links in one query per shard
+    plans = plans_for(db, lambda c: c.get("/customers/"))
+    assert_no_full_scans(plans, allowed={"customer", "customerproductlink"})
+
+
+def test_create_product(db):
+    plans = plans_for(db, lambda c: c.post("/products/", json={"sku_code": "SKU-NEW", "name": "New"}))
+    assert_no_full_scans(plans)
+
+
+def test_delta_sync(db):
+    client = TestClient(main.app)
+    cursor = client.get("/sync/").json()["cursor"]
+    client.delete("/shipments/1")
+    plans = plans_for(db, lambda c: c.get("/sync/", params={"since": cursor, "customer_id": 1}))
+    assert_no_full_scans(plans)
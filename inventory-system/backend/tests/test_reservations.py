@@ -0,0 +1,172 @@
+import threading
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+import main
+
+SHIP_DATE = "2026-01-01T00:00:00"
+
+
+def inventory_row(db, inventory_id=1):
+    with Session(db) as session:
+        return session.get(main.Inventory, inventory_id)
+
+
+def reserve(client, quantity, **extra):
+    return client.post("/reservations/", json={
+        "customer_id": 1, "items": [{"product_id": 1, "quantity": quantity}], **extra
+    })
+
+
+def test_reservation_holds_stock_against_shipments(db):
+    client = TestClient(main.app)
+    assert reserve(client, 80).status_code == 200
+    assert inventory_row(db).reserved_quantity == 80
+
+    response = client.post("/shipments/", json={"customer_id": 1, "product_id": 1, "quantity": 30, "shipment_date": SHIP_DATE})
+    assert response.status_code == 400
+    assert reserve(client, 30).status_code == 400
+
+
+def test_concurrent_reservations_cannot_oversell(db):
+    client = TestClient(main.app)
+    barrier = threading.Barrier(8)
+    statuses = []
+
+    def worker():
+        barrier.wait()
+        statuses.append(reserve(client, 30).status_code)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert statuses.count(200) == 3
+    assert inventory_row(db).reserved_quantity == 90
+
+
+def test_concurrent_shipments_and_reservations_cannot_oversell(db):
+    client = TestClient(main.app)
+    barrier = threading.Barrier(6)
+    shipped = []
+    reserved = []
+
+    def ship():
+        barrier.wait()
+        response = client.post("/shipments/", json={"customer_id": 1, "product_id": 1, "quantity": 30, "shipment_date": SHIP_DATE})
+        shipped.append(response.status_code)
+
+    def hold():
+        barrier.wait()
+        reserved.append(reserve(client, 30).status_code)
+
+    threads = [threading.Thread(target=ship) for _ in range(4)] + [threading.Thread(target=hold) for _ in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    # 100 units only cover three 30-unit requests, whichever kind wins
+    assert shipped.count(200) + reserved.count(200) == 3
+    row = inventory_row(db)
+    assert row.quantity == 100 - 30 * shipped.count(200)
+    assert row.reserved_quantity == 30 * reserved.count(200)
+    assert row.quantity >= row.reserved_quantity
+
+
+def test_shipment_edit_respects_reserved_stock(db):
+    client = TestClient(main.app)
+    assert reserve(client, 80).status_code == 200
+
+    # Shipment 1 is 1 unit of customer 1 / product 1; only 20 units are free
+    assert client.put("/shipments/1", json={"quantity": 30}).status_code == 400
+    assert client.put("/shipments/1", json={"quantity": 21}).status_code == 200
+    assert inventory_row(db).quantity == 80
+    assert client.delete("/shipments/1").status_code == 200
+    assert inventory_row(db).quantity == 101
+
+
+def test_rejects_non_positive_quantity_and_ttl(db):
+    client = TestClient(main.app)
+    assert reserve(client, -5).status_code == 422
+    assert reserve(client, 0).status_code == 422
+    assert reserve(client, 5, ttl_seconds=-100).status_code == 422
+    assert client.post("/reservations/1/extend", json={"ttl_seconds": 0}).status_code == 422
+    assert client.post("/reservations/", json={"customer_id": 1, "items": []}).status_code == 422
+    assert inventory_row(db).reserved_quantity == 0
+
+
+def test_set_qty_cannot_drop_below_reserved(db):
+    client = TestClient(main.app)
+    reserve(client, 80)
+    assert client.put("/inventory/1", json={"quantity": 20}).status_code == 400
+    assert client.put("/inventory/1", json={"quantity": 80}).status_code == 200
+
+
+def test_extend_moves_expiry(db):
+    client = TestClient(main.app)
+    reservation = reserve(client, 10, ttl_seconds=5).json()
+    extended = client.post(f"/reservations/{reservation['id']}/extend", json={"ttl_seconds": 3600}).json()
+    assert extended["expires_at"] > reservation["expires_at"]
+
+
+def test_extend_rejects_reservation_expired_mid_request(db, monkeypatch):
+    client = TestClient(main.app)
+    reservation = reserve(client, 10).json()
+    get_active = main.get_active_reservation
+
+    def expire_after_read(sessions, reservation_id, customer_id):
+        # The sweeper wins the race between the read and the write
+        found = get_active(sessions, reservation_id, customer_id)
+        with Session(db) as session:
+            row = session.get(main.Reservation, reservation_id)
+            row.status = "expired"
+            session.add(row)
+            session.commit()
+        return found
+
+    monkeypatch.setattr(main, "get_active_reservation", expire_after_read)
+    response = client.post(f"/reservations/{reservation['id']}/extend", json={"ttl_seconds": 3600})
+    assert response.status_code == 400
+    with Session(db) as session:
+        assert session.get(main.Reservation, reservation["id"]).expires_at.isoformat() == reservation["expires_at"]
+
+
+def test_release_returns_stock(db):
+    client = TestClient(main.app)
+    reservation = reserve(client, 40).json()
+    assert client.post(f"/reservations/{reservation['id']}/release").status_code == 200
+    assert inventory_row(db).reserved_quantity == 0
+    assert client.post(f"/reservations/{reservation['id']}/release").status_code == 400
+
+
+def test_commit_creates_shipments_once(db):
+    client = TestClient(main.app)
+    reservation = reserve(client, 40).json()
+    response = client.post(f"/reservations/{reservation['id']}/commit", json={"shipment_date": SHIP_DATE, "rma_ticket": "R-1"})
+    assert response.status_code == 200
+    assert [(s["product_id"], s["quantity"], s["rma_ticket"]) for s in response.json()] == [(1, 40, "R-1")]
+
+    row = inventory_row(db)
+    assert (row.quantity, row.reserved_quantity) == (60, 0)
+    assert client.post(f"/reservations/{reservation['id']}/commit", json={"shipment_date": SHIP_DATE}).status_code == 400
+    assert inventory_row(db).quantity == 60
+
+
+def test_sweeper_expires_and_returns_stock(db):
+    client = TestClient(main.app)
+    reservation = reserve(client, 40).json()
+    with Session(db) as session:
+        row = session.get(main.Reservation, reservation["id"])
+        row.expires_at = datetime.now() - timedelta(seconds=1)
+        session.add(row)
+        session.commit()
+
+    assert main.expire_reservations() == 1
+    assert inventory_row(db).reserved_quantity == 0
+    assert main.expire_reservations() == 0
+    assert client.post(f"/reservations/{reservation['id']}/commit", json={"shipment_date": SHIP_DATE}).status_code == 400
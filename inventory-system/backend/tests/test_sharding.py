@@ -0,0 +1,129 @@
+import os
+from collections import OrderedDict
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import inspect as sa_inspect
+from sqlmodel import Session, create_engine, select
+
+import main
+import manage_shards
+
+SHIP_DATE = "2026-01-01T00:00:00"
+
+
+@pytest.fixture()
+def sharded(db, tmp_path, monkeypatch):
+    shard_dir = tmp_path / "shards"
+    shard_dir.mkdir()
+    monkeypatch.setattr(main, "SHARDING_ENABLED", True)
+    monkeypatch.setattr(main, "SHARD_DIR", str(shard_dir))
+    monkeypatch.setattr(main, "sqlite_file_name", str(tmp_path / "test.db"))
+    monkeypatch.setattr(main, "shard_engines", OrderedDict())
+    monkeypatch.setattr(main, "migrated_shard_paths", set())
+    return shard_dir
+
+
+def test_reads_do_not_create_shards(sharded):
+    client = TestClient(main.app)
+    assert client.get("/customers/").status_code == 200
+    assert client.get("/inventory/", params={"customer_id": 99}).json() == []
+    assert client.get("/inventory/summary", params={"customer_id": 99}).json() == []
+    assert client.get("/customers/99/products").json() == []
+    assert client.delete("/inventory/1", params={"customer_id": 99}).status_code == 404
+    assert client.post("/shipments/", json={"customer_id": 1, "product_id": 1, "quantity": 1, "shipment_date": SHIP_DATE}).status_code == 400
+    assert os.listdir(sharded) == []
+
+
+def test_split_moves_existing_rows(sharded):
+    manage_shards.split(purge=True)
+    assert sorted(os.listdir(sharded)) == ["customer_1.db", "customer_2.db", "customer_3.db"]
+
+    client = TestClient(main.app)
+    assert len(client.get("/inventory/").json()) == 15
+    assert [len(c["products"]) for c in client.get("/customers/").json()] == [5, 5, 5]
+    with Session(main.engine) as central:
+        assert central.exec(select(main.Inventory)).all() == []
+
+
+def test_cross_shard_batch_shipment(sharded):
+    manage_shards.split(purge=True)
+    client = TestClient(main.app)
+    response = client.post("/shipments/batch/", json={
+        "customer_id": 1, "shipment_date": SHIP_DATE,
+        "items": [{"product_id": 1, "quantity": 5}, {"product_id": 2, "quantity": 7, "stock_source_customer_id": 2}]
+    })
+    assert response.status_code == 200
+
+    lines = {(i["customer_id"], i["product_id"]): i["quantity"] for i in client.get("/inventory/").json()}
+    assert lines[(1, 1)] == 95 and lines[(2, 2)] == 93
+    assert len(client.get("/shipments/").json()) == 17
+
+
+def test_shards_are_migrated_and_stamped(sharded):
+    client = TestClient(main.app)
+    client.post("/customers/4/products/1")
+    shard_engine = create_engine(f"sqlite:///{sharded / 'customer_4.db'}")
+    with shard_engine.connect() as connection:
+        assert sa_inspect(connection).has_table("alembic_version")
+        columns = {c["name"] for c in sa_inspect(connection).get_columns("inventory")}
+    assert "change_seq" in columns
+
+
+def test_engine_cache_is_bounded(sharded, monkeypatch):
+    monkeypatch.setattr(main, "MAX_OPEN_SHARDS", 2)
+    client = TestClient(main.app)
+    for customer_id in (1, 2, 3):
+        client.post(f"/customers/{customer_id}/products/1")
+    assert list(main.shard_engines.keys()) == [2, 3]
+
+
+def test_fan_out_reads_leave_engine_cache_alone(sharded, monkeypatch):
+    monkeypatch.setattr(main, "MAX_OPEN_SHARDS", 2)
+    manage_shards.split(purge=True)
+    cached = list(main.shard_engines.items())
+
+    client = TestClient(main.app)
+    assert len(client.get("/inventory/").json()) == 15
+    assert len(client.get("/sync/").json()["inventory"]) == 15
+    assert list(main.shard_engines.items()) == cached
+
+
+def test_shards_are_migrated_once_per_process(sharded, monkeypatch):
+    monkeypatch.setattr(main, "MAX_OPEN_SHARDS", 1)
+    migrated = []
+    migrate_shard = main.migrate_shard
+    monkeypatch.setattr(main, "migrate_shard", lambda path: (migrated.append(path), migrate_shard(path)))
+    manage_shards.split(purge=True)
+
+    client = TestClient(main.app)
+    for _ in range(3):
+        client.get("/inventory/")
+        for customer_id in (1, 2, 3):
+            client.get("/inventory/summary", params={"customer_id": customer_id})
+    assert sorted(os.path.basename(path) for path in migrated) == ["customer_1.db", "customer_2.db", "customer_3.db"]
+
+
+def test_sharded_sync_cursor_round_trips(sharded):
+    manage_shards.split(purge=True)
+    client = TestClient(main.app)
+    snapshot = client.get("/sync/").json()
+    assert [part.split(":")[0] for part in snapshot["cursor"].split(",")] == ["catalog", "shard1", "shard2", "shard3"]
+    assert len(snapshot["inventory"]) == 15 and len(snapshot["links"]) == 15
+
+    # Ship from customer 2's stock for customer 1, then rename a product
+    response = client.post("/shipments/", json={
+        "customer_id": 1, "product_id": 3, "quantity": 4, "shipment_date": SHIP_DATE, "stock_source_customer_id": 2
+    })
+    assert response.status_code == 200
+    assert client.put("/products/1", json={"sku_code": "SKU-0", "name": "Renamed"}).status_code == 200
+
+    changes = client.get("/sync/", params={"since": snapshot["cursor"]}).json()
+    assert [(i["customer_id"], i["product_id"], i["quantity"]) for i in changes["inventory"]] == [(2, 3, 96)]
+    assert [(s["customer_id"], s["quantity"]) for s in changes["shipments"]] == [(1, 4)]
+    assert [p["name"] for p in changes["products"]] == ["Renamed"]
+    assert changes["cursor"] != snapshot["cursor"]
+
+    again = client.get("/sync/", params={"since": changes["cursor"]}).json()
+    assert again["cursor"] == changes["cursor"]
+    assert all(again[field] == [] for field in list(main.SYNC_FIELDS.values()) + ["tombstones"])
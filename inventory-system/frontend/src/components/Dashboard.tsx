@@ -1,6 +1,6 @@
 import React, { useEffect, useState } from 'react';
 import { Table, Button, Container, Row, Col, Badge, Nav, Card, InputGroup, Form } from 'react-bootstrap';
-import type { InventoryItem, Customer } from '../types';
+import type { InventoryItem, InventorySummary, Customer } from '../types';
 import { api } from '../api';
 import AddInventoryModal from './AddInventoryModal';
 import CustomerManager from './CustomerManager';
@@ -9,7 +9,9 @@ import ShipmentManager from './ShipmentManager';
 import InboundHistoryManager from './InboundHistoryManager';
 
 const Dashboard: React.FC = () => {
-  const [inventory, setInventory] = useState<InventoryItem[]>([]);
+  const [summaries, setSummaries] = useState<InventorySummary[]>([]);
+  // Lines are only loaded for customers the user has expanded
+  const [expandedLines, setExpandedLines] = useState<Record<number, InventoryItem[]>>({});
   const [customers, setCustomers] = useState<Customer[]>([]);
   const [showAddModal, setShowAddModal] = useState(false);
   const [activeTab, setActiveTab] = useState('inventory');
@@ -19,15 +21,24 @@ const Dashboard: React.FC = () => {
   // Inventory Filter State
   const [filterCustId, setFilterCustId] = useState<number>(0);
 
+  const fetchLines = async (custId: number) => {
+    const res = await api.get<InventoryItem[]>('/inventory/', { params: { customer_id: custId } });
+    setExpandedLines(prev => ({ ...prev, [custId]: res.data }));
+  };
+
   const fetchData = async () => {
     try {
-        // Fetch inventory and customers together to populate filter
-        const [invRes, custRes] = await Promise.all([
-            api.get<InventoryItem[]>('/inventory/'),
+        // Fetch per-customer totals and customers together to populate filter
+        const [sumRes, custRes] = await Promise.all([
+            api.get<InventorySummary[]>('/inventory/summary', {
+                params: filterCustId !== 0 ? { customer_id: filterCustId } : {}
+            }),
             api.get<Customer[]>('/customers/')
         ]);
-        setInventory(invRes.data);
+        setSummaries(sumRes.data);
         setCustomers(custRes.data);
+        // Re-fetch lines of customers that are still expanded
+        await Promise.all(Object.keys(expandedLines).map(custId => fetchLines(Number(custId))));
     } catch (error) {
         console.error("Failed to fetch data", error);
     }
@@ -35,13 +46,29 @@ const Dashboard: React.FC = () => {
 
   useEffect(() => {
     if (activeTab === 'inventory') fetchData();
-  }, [activeTab, refreshTrigger]); 
+  }, [activeTab, refreshTrigger, filterCustId]); 
+
+  const toggleExpand = async (custId: number) => {
+    if (expandedLines[custId]) {
+        setExpandedLines(prev => {
+            const next = { ...prev };
+            delete next[custId];
+            return next;
+        });
+        return;
+    }
+    try {
+        await fetchLines(custId);
+    } catch (error) {
+        console.error("Failed to fetch inventory lines", error);
+    }
+  };
 
   // --- Handlers ---
-  const handleDelete = async (id: number) => {
+  const handleDelete = async (id: number, custId: number) => {
     if (window.confirm("Delete this inventory entry?")) {
       try {
-        await api.delete(`/inventory/${id}`);
+        await api.delete(`/inventory/${id}`, { params: { customer_id: custId } });
         fetchData(); // Refresh both inventory and potentially customers list logic
       } catch (error) {
         console.error("Delete failed", error);
@@ -49,11 +76,11 @@ const Dashboard: React.FC = () => {
     }
   };
 
-  const handleUpdateQty = async (id: number, currentQty: number) => {
+  const handleUpdateQty = async (id: number, custId: number, currentQty: number) => {
     const newQty = prompt("Enter new quantity (Overwrite):", currentQty.toString());
     if (newQty !== null) {
         try {
-            await api.put(`/inventory/${id}`, { quantity: parseInt(newQty) });
+            await api.put(`/inventory/${id}`, { quantity: parseInt(newQty) }, { params: { customer_id: custId } });
             fetchData();
         } catch (error) {
             console.error("Update qty failed", error);
@@ -61,7 +88,7 @@ const Dashboard: React.FC = () => {
     }
   }
 
-  const handleSetAlerts = async (id: number, currentSafety: number, currentTarget: number) => {
+  const handleSetAlerts = async (id: number, custId: number, currentSafety: number, currentTarget: number) => {
     const safety = prompt("Enter Safety Stock Threshold (Min):", currentSafety?.toString() || "0");
     if (safety === null) return;
     const target = prompt("Enter Target Stock Level (Ideal):", currentTarget?.toString() || "0");
@@ -71,7 +98,7 @@ const Dashboard: React.FC = () => {
         await api.put(`/inventory/${id}`, { 
             safety_stock: parseInt(safety),
             target_stock: parseInt(target)
-        });
+        }, { params: { customer_id: custId } });
         fetchData();
     } catch (error) {
         console.error("Update alerts failed", error);
@@ -88,20 +115,6 @@ const Dashboard: React.FC = () => {
       setShowAddModal(true);
   };
 
-  // --- Grouping Logic ---
-  const groupedInventory = inventory.reduce((acc, item) => {
-      // Filter logic
-      if (filterCustId !== 0 && item.customer_id !== filterCustId) return acc;
-
-      const custId = item.customer_id;
-      const custName = item.customer?.name || 'Unknown Customer';
-      if (!acc[custId]) {
-          acc[custId] = { name: custName, items: [] };
-      }
-      acc[custId].items.push(item);
-      return acc;
-  }, {} as Record<number, { name: string; items: InventoryItem[] }>);
-
   // --- Render Content ---
   const renderContent = () => {
     switch (activeTab) {
@@ -135,21 +148,28 @@ const Dashboard: React.FC = () => {
                 </div>
             </div>
             
-            {inventory.length === 0 ? (
+            {summaries.length === 0 ? (
                 <div className="text-center py-5 text-muted">No inventory records found. Start by adding stock.</div>
             ) : (
                 <div className="d-flex flex-column gap-5 mb-5">
-                    {Object.entries(groupedInventory).map(([custId, group]) => (
-                        <Card key={custId} className="border-0 shadow">
+                    {summaries.map((group) => (
+                        <Card key={group.customer_id} className="border-0 shadow">
                             <Card.Header className="bg-dark text-white d-flex justify-content-between align-items-center py-3">
                                 <div>
-                                    <span className="fs-4 fw-bold">👤 {group.name}</span> 
-                                    <Badge bg="info" text="dark" className="ms-3">{group.items.length} SKUs Listed</Badge>
+                                    <span className="fs-4 fw-bold">👤 {group.customer_name}</span> 
+                                    <Badge bg="info" text="dark" className="ms-3">{group.sku_count} SKUs Listed</Badge>
+                                    <Badge bg="light" text="dark" className="ms-2">{group.total_quantity} Units</Badge>
+                                    {group.below_safety_count > 0 && <Badge bg="danger" className="ms-2">{group.below_safety_count} Low Stock</Badge>}
+                                    {group.below_target_count > 0 && <Badge bg="warning" text="dark" className="ms-2">{group.below_target_count} Under Target</Badge>}
                                 </div>
                                 <div>
-                                    <Button variant="success" size="sm" onClick={() => handleOpenAddModal(Number(custId))}>+ Quick Stock In</Button>
+                                    <Button variant="outline-light" size="sm" className="me-2" onClick={() => toggleExpand(group.customer_id)}>
+                                        {expandedLines[group.customer_id] ? 'Hide Lines' : 'Show Lines'}
+                                    </Button>
+                                    <Button variant="success" size="sm" onClick={() => handleOpenAddModal(group.customer_id)}>+ Quick Stock In</Button>
                                 </div>
                             </Card.Header>
+                            {expandedLines[group.customer_id] && (
                             <Table striped hover responsive className="mb-0 border-top">
                                 <thead className="bg-light">
                                     <tr className="text-secondary small text-uppercase">
@@ -161,7 +181,7 @@ const Dashboard: React.FC = () => {
                                     </tr>
                                 </thead>
                                 <tbody>
-                                    {group.items.map((item) => {
+                                    {expandedLines[group.customer_id].map((item) => {
                                         const isLowStock = (item.safety_stock || 0) > 0 && item.quantity <= (item.safety_stock || 0);
                                         return (
                                             <tr key={item.id} className={isLowStock ? "table-danger" : ""}>
@@ -175,6 +195,7 @@ const Dashboard: React.FC = () => {
                                                         {item.quantity}
                                                     </span>
                                                     <span className="text-muted ms-2">/ {item.target_stock || '-'}</span>
+                                                    {(item.reserved_quantity || 0) > 0 && <div className="text-muted small">{item.reserved_quantity} reserved</div>}
                                                 </td>
                                                 <td>
                                                     {isLowStock ? 
@@ -183,15 +204,16 @@ const Dashboard: React.FC = () => {
                                                     }
                                                 </td>
                                                 <td className="pe-4">
-                                                    <Button variant="outline-primary" size="sm" className="me-2 rounded-pill" onClick={() => item.id && handleUpdateQty(item.id, item.quantity)}>Set Qty</Button>
-                                                    <Button variant="outline-dark" size="sm" className="me-2 rounded-pill" onClick={() => item.id && handleSetAlerts(item.id, item.safety_stock || 0, item.target_stock || 0)}>Alerts</Button>
-                                                    <Button variant="outline-danger" size="sm" className="rounded-pill" onClick={() => item.id && handleDelete(item.id)}>Del</Button>
+                                                    <Button variant="outline-primary" size="sm" className="me-2 rounded-pill" onClick={() => item.id && handleUpdateQty(item.id, item.customer_id, item.quantity)}>Set Qty</Button>
+                                                    <Button variant="outline-dark" size="sm" className="me-2 rounded-pill" onClick={() => item.id && handleSetAlerts(item.id, item.customer_id, item.safety_stock || 0, item.target_stock || 0)}>Alerts</Button>
+                                                    <Button variant="outline-danger" size="sm" className="rounded-pill" onClick={() => item.id && handleDelete(item.id, item.customer_id)}>Del</Button>
                                                 </td>
                                             </tr>
                                         );
                                     })}
                                 </tbody>
                             </Table>
+                            )}
                         </Card>
                     ))}
                 </div>
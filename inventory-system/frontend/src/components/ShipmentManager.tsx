@@ -111,10 +111,10 @@ const ShipmentManager: React.FC = () => {
       setShowModal(true);
       setError(null);
     };
-  const handleDelete = async (id: number) => {
+  const handleDelete = async (id: number, custId: number) => {
     if(!confirm("Delete this shipment? Stock will be RETURNED.")) return;
     try {
-        await api.delete(`/shipments/${id}`);
+        await api.delete(`/shipments/${id}`, { params: { customer_id: custId } });
         fetchData();
     } catch (e) { alert("Delete failed."); }
   };
@@ -156,7 +156,7 @@ const ShipmentManager: React.FC = () => {
                 quantity: validItems[0].quantity,
                 shipment_date: new Date(date).toISOString(),
                 rma_ticket: rma
-            });
+            }, { params: { customer_id: selectedCust } });
         } else {
             await api.post('/shipments/batch/', {
                 customer_id: selectedCust,
@@ -216,7 +216,7 @@ const ShipmentManager: React.FC = () => {
                         <td>{s.rma_ticket ? <span className="text-monospace bg-light px-2 py-1 border rounded small">{s.rma_ticket}</span> : '-'}</td>
                         <td className="text-end pe-4">
                             <Button variant="outline-primary" size="sm" className="me-2" onClick={() => handleEdit(s)}>Edit</Button>
-                            <Button variant="outline-danger" size="sm" onClick={() => s.id && handleDelete(s.id)}>Del</Button>
+                            <Button variant="outline-danger" size="sm" onClick={() => s.id && handleDelete(s.id, s.customer_id)}>Del</Button>
                         </td>
                     </tr>
                     ))
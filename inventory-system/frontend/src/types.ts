@@ -19,11 +19,21 @@ export interface InventoryItem {
   quantity: number;
   target_stock?: number;
   safety_stock?: number;
+  reserved_quantity?: number;
   updated_at?: string;
   customer?: Customer;
   product?: Product;
 }
 
+export interface InventorySummary {
+  customer_id: number;
+  customer_name: string;
+  sku_count: number;
+  total_quantity: number;
+  below_safety_count: number;
+  below_target_count: number;
+}
+
 export interface Shipment {
   id?: number;
   customer_id: number;
@@ -46,3 +56,47 @@ export interface InboundTransaction {
   customer?: Customer;
   product?: Product;
 }
+
+export interface ReservationItem {
+  id?: number;
+  reservation_id: number;
+  inventory_id: number;
+  product_id: number;
+  stock_source_customer_id: number;
+  quantity: number;
+}
+
+export interface Reservation {
+  id?: number;
+  customer_id: number;
+  status: 'active' | 'committed' | 'released' | 'expired';
+  expires_at: string;
+  created_at?: string;
+  items: ReservationItem[];
+}
+
+export interface CustomerProductLink {
+  customer_id: number;
+  product_id: number;
+  change_seq: number;
+}
+
+export interface Tombstone {
+  id?: number;
+  table_name: string;
+  row_id: number;
+  customer_id?: number;
+  change_seq: number;
+  deleted_at: string;
+}
+
+export interface SyncResponse {
+  cursor: string;
+  customers: Customer[];
+  products: Product[];
+  inventory: InventoryItem[];
+  shipments: Shipment[];
+  inbound: InboundTransaction[];
+  links: CustomerProductLink[];
+  tombstones: Tombstone[];
+}